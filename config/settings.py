@@ -5,49 +5,102 @@ and directory configurations.
 """
 
 import os
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
+from utils.io_utils import ensure_dir
 
 # Base directory paths
 BASE_DIR = Path(__file__).parent.parent
-OUTPUTS_DIR = os.path.join(BASE_DIR, "outputs")
-LOGS_DIR = os.path.join(BASE_DIR, "logs")
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Environment-dependent settings, resolved once per process."""
+    outputs_dir: Path
+    logs_dir: Path
+    openai_api_key: str
+    
+    @property
+    def torch_full_load(self):
+        """TORCH_FULL_LOAD, read on every access since the voice cloner sets it at runtime."""
+        return os.environ.get("TORCH_FULL_LOAD")
+
+def _load_openai_api_key():
+    """Read the OpenAI API key from config/api_keys.py or the environment."""
+    # Try to import API keys from api_keys.py, fall back to environment variables
+    try:
+        from config.api_keys import OPENAI_API_KEY
+    except ImportError:
+        # API keys (replace with your actual keys if needed)
+        # It's better to use environment variables in production
+        OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "")
+    return OPENAI_API_KEY
+
+@lru_cache(maxsize=1)
+def get_settings():
+    """
+    Build the settings object on first use and return the cached instance afterwards.
+    
+    Returns:
+        Settings: Process-wide settings
+    """
+    return Settings(
+        outputs_dir=BASE_DIR / "outputs",
+        logs_dir=BASE_DIR / "logs",
+        openai_api_key=_load_openai_api_key()
+    )
+
+_settings = get_settings()
+OUTPUTS_DIR = str(_settings.outputs_dir)
+LOGS_DIR = str(_settings.logs_dir)
+
+def ensure_outputs_dir():
+    """
+    Create the outputs directory on first use and return its path.
+    Importing the settings doesn't touch the filesystem for it, so callers
+    only pay the mkdir when they actually write there.
+    
+    Returns:
+        str: Path to the outputs directory
+    """
+    return ensure_dir(OUTPUTS_DIR)
 
 # Create required directories if they don't exist
-os.makedirs(OUTPUTS_DIR, exist_ok=True)
-os.makedirs(LOGS_DIR, exist_ok=True)
+ensure_dir(LOGS_DIR)
 
 # Temporary file paths
-TEMP_VIDEO_PATH = os.path.join(OUTPUTS_DIR, "temp_video.mp4")
-TEMP_AUDIO_PATH = os.path.join(OUTPUTS_DIR, "temp_audio.wav")
-TEMP_TRANSCRIPT_PATH = os.path.join(OUTPUTS_DIR, "transcript.txt")
-TEMP_TRANSLATED_PATH = os.path.join(OUTPUTS_DIR, "translated.txt")
-TEMP_DUBBED_AUDIO_PATH = os.path.join(OUTPUTS_DIR, "dubbed_audio.wav")
-OUTPUT_VIDEO_PATH = os.path.join(OUTPUTS_DIR, "dubbed_video.mp4")
+TEMP_VIDEO_PATH = str(_settings.outputs_dir / "temp_video.mp4")
+TEMP_AUDIO_PATH = str(_settings.outputs_dir / "temp_audio.wav")
+TEMP_TRANSCRIPT_PATH = str(_settings.outputs_dir / "transcript.txt")
+TEMP_TRANSLATED_PATH = str(_settings.outputs_dir / "translated.txt")
+TEMP_DUBBED_AUDIO_PATH = str(_settings.outputs_dir / "dubbed_audio.wav")
+OUTPUT_VIDEO_PATH = str(_settings.outputs_dir / "dubbed_video.mp4")
 
 # Language settings
 SOURCE_LANGUAGE = "en"  # Default source language
 TARGET_LANGUAGE = "tr"  # Default target language
 
-# Try to import API keys from api_keys.py, fall back to environment variables
-try:
-    from config.api_keys import OPENAI_API_KEY
-except ImportError:
-    # API keys (replace with your actual keys if needed)
-    # It's better to use environment variables in production
-    OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "")
+# API key (see config/api_keys.py.example), resolved once in get_settings()
+OPENAI_API_KEY = _settings.openai_api_key
 
 # Whisper settings
 WHISPER_MODEL = "base"  # Options: tiny, base, small, medium, large
+WHISPER_BACKEND = "faster"  # Options: faster (faster-whisper, falls back to openai if missing), openai
 
 # TTS settings 
 TTS_ENGINE = "gtts"  # Options: bark, coqui, gtts, voice_clone
+XTTS_COMPILE = False  # Compile the XTTS decoder and vocoder with torch.compile (slow first call, faster afterwards)
+XTTS_INT8 = False  # Quantize the XTTS GPT decoder to int8 with bitsandbytes on GPUs with little free memory
+
+# Offline Piper voices for the gTTS fallback, one <lang>.onnx (+ .onnx.json) per language
+PIPER_VOICES_DIR = str(BASE_DIR / "voices")
 
 # Reference audio for voice cloning (if TTS_ENGINE is voice_clone)
-REFERENCE_AUDIO_PATH = os.path.join(OUTPUTS_DIR, "reference_audio.wav")
+REFERENCE_AUDIO_PATH = str(_settings.outputs_dir / "reference_audio.wav")
 
 # Translation settings
 TRANSLATION_ENGINE = "google"  # Options: google, openai
 
 # Log settings
 LOG_LEVEL = "INFO"
-LOG_FILE = os.path.join(LOGS_DIR, "process.log") 
\ No newline at end of file
+LOG_FILE = str(_settings.logs_dir / "process.log") 
\ No newline at end of file
@@ -11,7 +11,11 @@ import os
 import sys
 import time
 import argparse
-from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from types import SimpleNamespace
 from config.settings import (
     SOURCE_LANGUAGE, TARGET_LANGUAGE, OUTPUT_VIDEO_PATH,
     TEMP_VIDEO_PATH, TEMP_AUDIO_PATH, TEMP_TRANSCRIPT_PATH,
@@ -20,44 +24,73 @@ from config.settings import (
     REFERENCE_AUDIO_PATH
 )
 from utils.logger import setup_logger
-from utils.downloader import download_youtube_video
-from utils.audio_extractor import extract_audio
-from utils.transcriber import transcribe_audio
-from utils.translator import translate_file
-from utils.tts import text_to_speech
-from utils.video_merger import merge_video_audio
-from utils.voice_cloner_fallback import clone_voice_and_speak
-try:
-    from utils.audio_recorder import record_audio, test_audio_device
-    HAS_AUDIO_RECORDER = True
-except ImportError:
-    HAS_AUDIO_RECORDER = False
+
+# Pipeline modules (and the torch/whisper/TTS stacks behind them) are imported
+# inside the stage that needs them, so CLI parsing and --help stay fast
 
 # Set up logger
 logger = setup_logger(__name__)
 
+# Separator lines, built once
+_SEP = "=" * 80
+_DASH = "-" * 80
+
+@lru_cache(maxsize=128)
+def _format_seconds(seconds):
+    """Format a whole number of seconds as H:MM:SS."""
+    hours, rem = divmod(seconds, 3600)
+    minutes, secs = divmod(rem, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}"
+
 def format_time(seconds):
     """Format seconds into a readable time string."""
-    return str(timedelta(seconds=int(seconds)))
+    return _format_seconds(int(seconds))
 
 def print_stage_header(stage, title):
     """Print a formatted stage header to the console."""
-    print("\n" + "=" * 80)
-    print(f"[AŞAMA {stage}/6] {title}")
-    print("-" * 80)
+    sys.stdout.write(f"\n{_SEP}\n[AŞAMA {stage}/6] {title}\n{_DASH}\n")
 
 def print_stage_completion(stage, title, time_taken):
     """Print a formatted stage completion message."""
-    print("-" * 80)
-    print(f"✅ AŞAMA {stage}/6 TAMAMLANDI: {title}")
-    print(f"⏱️ Geçen süre: {format_time(time_taken)}")
-    print("=" * 80)
+    sys.stdout.write(
+        f"{_DASH}\n✅ AŞAMA {stage}/6 TAMAMLANDI: {title}\n"
+        f"⏱️ Geçen süre: {format_time(time_taken)}\n{_SEP}\n"
+    )
+    # Flush once per stage so progress shows up immediately on a terminal
+    if sys.stdout.isatty():
+        sys.stdout.flush()
+
+@contextmanager
+def stage(number, title, completed_title):
+    """
+    Print a stage header, time the wrapped block and print its completion message.
+    
+    The block sets ``status.completed = True`` once the stage succeeded; if it
+    returns early on failure, the completion message is skipped.
+    
+    Args:
+        number (int): Stage number (1-6)
+        title (str): Title shown in the stage header
+        completed_title (str): Title shown in the completion message
+    """
+    print_stage_header(number, title)
+    status = SimpleNamespace(completed=False)
+    start_time = time.perf_counter()
+    yield status
+    if status.completed:
+        print_stage_completion(number, completed_title, time.perf_counter() - start_time)
+
+def load_whisper_model():
+    """Import the transcriber and load the configured Whisper model."""
+    from utils.transcriber import load_model
+    return load_model(WHISPER_MODEL)
 
 def get_file_size_mb(file_path):
     """Get file size in MB."""
-    if os.path.exists(file_path):
-        return os.path.getsize(file_path) / (1024 * 1024)
-    return 0
+    try:
+        return os.stat(file_path).st_size / 1048576.0
+    except OSError:
+        return 0.0
 
 def process_video(youtube_url, source_lang=SOURCE_LANGUAGE, target_lang=TARGET_LANGUAGE, 
                 tts_engine=TTS_ENGINE, reference_audio=None):
@@ -74,186 +107,218 @@ def process_video(youtube_url, source_lang=SOURCE_LANGUAGE, target_lang=TARGET_L
     Returns:
         str: Path to the output dubbed video, or None if processing failed
     """
+    # Background worker that loads the Whisper model (and imports torch/whisper)
+    # while the download and audio extraction stages run
+    executor = ThreadPoolExecutor(max_workers=1)
+    
     try:
-        total_start_time = time.time()
+        total_start_time = time.perf_counter()
         
         # Print welcome message
-        print("\n" + "=" * 80)
+        print("\n" + _SEP)
         print(f"🎬 AI DUBLAJ PROJESİ BAŞLATILIYOR")
         print(f"🔗 Video URL: {youtube_url}")
         print(f"🈯 Kaynak dil: {source_lang} → Hedef dil: {target_lang}")
         print(f"⚙️ Yapılandırma: Whisper {WHISPER_MODEL}, Çeviri: {TRANSLATION_ENGINE}, TTS: {tts_engine}")
         if tts_engine == "voice_clone" and reference_audio:
             print(f"🎤 Ses Klonlama: Referans ses dosyası: {reference_audio}")
-        print("=" * 80)
+        print(_SEP)
         
         logger.info("=" * 50)
         logger.info(f"Starting AI dubbing process for: {youtube_url}")
         logger.info(f"Source language: {source_lang}, Target language: {target_lang}")
         logger.info("=" * 50)
         
-        # Step 1: Download the YouTube video
-        print_stage_header(1, "YOUTUBE VİDEOSU İNDİRİLİYOR")
-        print(f"URL: {youtube_url}")
-        print(f"Hedef: {TEMP_VIDEO_PATH}")
-        
-        step_start_time = time.time()
-        video_path = download_youtube_video(youtube_url, TEMP_VIDEO_PATH)
-        step_time = time.time() - step_start_time
+        whisper_future = executor.submit(load_whisper_model)
         
-        if not video_path:
-            print("❌ HATA: Video indirilemedi!")
-            logger.error("Failed to download video. Exiting.")
-            return None
+        # Step 1: Download only the audio track; the video itself is fetched right before the merge
+        video_path = None
+        with stage(1, "YOUTUBE SESİ İNDİRİLİYOR", "YOUTUBE SESİ İNDİRİLDİ") as status:
+            print(f"URL: {youtube_url}")
+            print(f"Hedef: {TEMP_AUDIO_PATH}")
             
-        video_size = get_file_size_mb(video_path)
-        print(f"📊 Video boyutu: {video_size:.2f} MB")
-        print_stage_completion(1, "YOUTUBE VİDEOSU İNDİRİLDİ", step_time)
-        
-        # Step 2: Extract audio from the video
-        print_stage_header(2, "VİDEODAN SES ÇIKARILIYOR")
-        print(f"Kaynak: {video_path}")
-        print(f"Hedef: {TEMP_AUDIO_PATH}")
-        
-        step_start_time = time.time()
-        audio_path = extract_audio(video_path, TEMP_AUDIO_PATH)
-        step_time = time.time() - step_start_time
+            from utils.audio_extractor import extract_audio, extract_audio_from_url
+            
+            source_path = extract_audio_from_url(youtube_url, TEMP_AUDIO_PATH)
+            
+            if not source_path:
+                # Fall back to downloading the full video and extracting the audio from it
+                print("⚠️ Ses doğrudan indirilemedi, video indiriliyor...")
+                logger.warning("Audio-only download failed. Falling back to full video download.")
+                
+                from utils.downloader import download_youtube_video
+                
+                video_path = download_youtube_video(youtube_url, TEMP_VIDEO_PATH)
+                source_path = video_path
+            
+            if not source_path:
+                print("❌ HATA: Video indirilemedi!")
+                logger.error("Failed to download video. Exiting.")
+                return None
+                
+            source_size = get_file_size_mb(source_path)
+            print(f"📊 İndirilen dosya boyutu: {source_size:.2f} MB")
+            status.completed = True
         
-        if not audio_path:
-            print("❌ HATA: Ses çıkarılamadı!")
-            logger.error("Failed to extract audio. Exiting.")
-            return None
+        # Step 2: Decode the downloaded audio into memory
+        with stage(2, "SES ÇIKARILIYOR", "SES ÇIKARMA TAMAMLANDI") as status:
+            print(f"Kaynak: {source_path}")
+            print(f"Hedef: bellek (WAV dosyası yazılmadan doğrudan Whisper'a aktarılır)")
             
-        audio_size = get_file_size_mb(audio_path)
-        print(f"📊 Ses dosya boyutu: {audio_size:.2f} MB")
-        print_stage_completion(2, "SES ÇIKARMA TAMAMLANDI", step_time)
+            audio = extract_audio(source_path, return_array=True)
+            
+            if audio is None:
+                print("❌ HATA: Ses çıkarılamadı!")
+                logger.error("Failed to extract audio. Exiting.")
+                return None
+                
+            audio_size = audio.nbytes / (1024 * 1024)
+            print(f"📊 Ses verisi boyutu: {audio_size:.2f} MB")
+            status.completed = True
         
         # Step 3: Transcribe the audio to text
-        print_stage_header(3, "SES METİNE ÇEVRİLİYOR")
-        print(f"Kullanılan model: Whisper {WHISPER_MODEL}")
-        print(f"Kaynak dil: {source_lang}")
-        print(f"Kaynak: {audio_path}")
-        print(f"Hedef: {TEMP_TRANSCRIPT_PATH}")
-        
-        step_start_time = time.time()
-        transcript_path = transcribe_audio(audio_path, TEMP_TRANSCRIPT_PATH, language=source_lang)
-        step_time = time.time() - step_start_time
-        
-        if not transcript_path:
-            print("❌ HATA: Ses metine çevrilemedi!")
-            logger.error("Failed to transcribe audio. Exiting.")
-            return None
+        with stage(3, "SES METİNE ÇEVRİLİYOR", "TRANSKRIPT OLUŞTURULDU") as status:
+            print(f"Kullanılan model: Whisper {WHISPER_MODEL}")
+            print(f"Kaynak dil: {source_lang}")
+            print(f"Kaynak: bellekteki ses verisi")
+            print(f"Hedef: {TEMP_TRANSCRIPT_PATH}")
             
-        # Get transcript length (character count)
-        transcript_length = 0
-        with open(transcript_path, 'r', encoding='utf-8') as f:
-            transcript = f.read()
-            transcript_length = len(transcript)
+            from utils.transcriber import transcribe_audio
             
-        print(f"📝 Transkript uzunluğu: {transcript_length} karakter")
-        print(f"📊 İlk 100 karakter: {transcript[:100]}...")
-        print_stage_completion(3, "TRANSKRIPT OLUŞTURULDU", step_time)
+            # Use the model preloaded in the background (transcribe_audio retries the load if it failed)
+            try:
+                whisper_model = whisper_future.result()
+            except Exception as e:
+                logger.warning(f"Background Whisper model load failed: {str(e)}")
+                whisper_model = None
+            
+            transcript_path = transcribe_audio(audio, TEMP_TRANSCRIPT_PATH, language=source_lang,
+                                             model=whisper_model)
+            
+            if not transcript_path:
+                print("❌ HATA: Ses metine çevrilemedi!")
+                logger.error("Failed to transcribe audio. Exiting.")
+                return None
+                
+            # Get transcript size and preview without reading the whole file
+            transcript_size = os.stat(transcript_path).st_size
+            with open(transcript_path, 'r', encoding='utf-8') as f:
+                transcript_preview = f.read(100)
+                
+            print(f"📝 Transkript boyutu: {transcript_size} bayt")
+            print(f"📊 İlk 100 karakter: {transcript_preview}...")
+            status.completed = True
         
         # Step 4: Translate the transcription
-        print_stage_header(4, "METİN ÇEVRİLİYOR")
-        print(f"Çeviri motoru: {TRANSLATION_ENGINE}")
-        print(f"Dil çifti: {source_lang} → {target_lang}")
-        print(f"Kaynak: {transcript_path}")
-        print(f"Hedef: {TEMP_TRANSLATED_PATH}")
-        
-        step_start_time = time.time()
-        translated_path = translate_file(transcript_path, TEMP_TRANSLATED_PATH, 
-                                      source_lang=source_lang, target_lang=target_lang)
-        step_time = time.time() - step_start_time
-        
-        if not translated_path:
-            print("❌ HATA: Metin çevrilemedi!")
-            logger.error("Failed to translate text. Exiting.")
-            return None
+        with stage(4, "METİN ÇEVRİLİYOR", "ÇEVİRİ TAMAMLANDI") as status:
+            print(f"Çeviri motoru: {TRANSLATION_ENGINE}")
+            print(f"Dil çifti: {source_lang} → {target_lang}")
+            print(f"Kaynak: {transcript_path}")
+            print(f"Hedef: {TEMP_TRANSLATED_PATH}")
             
-        # Get translation length
-        translation_length = 0
-        with open(translated_path, 'r', encoding='utf-8') as f:
-            translation = f.read()
-            translation_length = len(translation)
+            from utils.translator import translate_file
             
-        print(f"📝 Çeviri uzunluğu: {translation_length} karakter")
-        print(f"📊 İlk 100 karakter: {translation[:100]}...")
-        print_stage_completion(4, "ÇEVİRİ TAMAMLANDI", step_time)
-        
-        # Step 5: Generate speech from translated text
-        print_stage_header(5, "ÇEVİRİLEN METİN SESE DÖNÜŞTÜRÜLÜYOR")
-        print(f"TTS motoru: {tts_engine}")
-        if tts_engine == "voice_clone" and reference_audio:
-            print(f"Referans ses: {reference_audio}")
-        print(f"Dil: {target_lang}")
-        print(f"Kaynak: {translated_path}")
-        print(f"Hedef: {TEMP_DUBBED_AUDIO_PATH}")
-        
-        step_start_time = time.time()
-        
-        # Use direct voice cloning if engine is set to voice_clone
-        if tts_engine == "voice_clone" and reference_audio:
-            # Read the translated text
+            translated_path = translate_file(transcript_path, TEMP_TRANSLATED_PATH, 
+                                          source_lang=source_lang, target_lang=target_lang)
+            
+            if not translated_path:
+                print("❌ HATA: Metin çevrilemedi!")
+                logger.error("Failed to translate text. Exiting.")
+                return None
+                
+            # Get translation size and preview without reading the whole file
+            translation_size = os.stat(translated_path).st_size
             with open(translated_path, 'r', encoding='utf-8') as f:
-                translated_text = f.read()
+                translation_preview = f.read(100)
                 
-            # Call our fallback voice cloner
-            dubbed_audio_path = clone_voice_and_speak(
-                text=translated_text,
-                speaker_wav_path=reference_audio,
-                target_lang=target_lang,
-                output_path=TEMP_DUBBED_AUDIO_PATH
-            )
-        else:
-            # Otherwise, use the regular text_to_speech function
-            dubbed_audio_path = text_to_speech(
-                translated_path, 
-                TEMP_DUBBED_AUDIO_PATH, 
-                language=target_lang,
-                engine=tts_engine,
-                reference_audio=reference_audio
-            )
-            
-        step_time = time.time() - step_start_time
+            print(f"📝 Çeviri boyutu: {translation_size} bayt")
+            print(f"📊 İlk 100 karakter: {translation_preview}...")
+            status.completed = True
         
-        if not dubbed_audio_path:
-            print("❌ HATA: Metin sese dönüştürülemedi!")
-            logger.error("Failed to generate speech. Exiting.")
-            return None
+        # Step 5: Generate speech from translated text
+        with stage(5, "ÇEVİRİLEN METİN SESE DÖNÜŞTÜRÜLÜYOR", "SESLER OLUŞTURULDU") as status:
+            print(f"TTS motoru: {tts_engine}")
+            if tts_engine == "voice_clone" and reference_audio:
+                print(f"Referans ses: {reference_audio}")
+            print(f"Dil: {target_lang}")
+            print(f"Kaynak: {translated_path}")
+            print(f"Hedef: {TEMP_DUBBED_AUDIO_PATH}")
+            
+            # Use direct voice cloning if engine is set to voice_clone
+            if tts_engine == "voice_clone" and reference_audio:
+                from utils.voice_cloner_fallback import clone_voice_and_speak
+                
+                # Read the translated text (only this branch needs it in full)
+                translation = Path(translated_path).read_text(encoding='utf-8')
+                
+                # Call our fallback voice cloner
+                dubbed_audio_path = clone_voice_and_speak(
+                    text=translation,
+                    speaker_wav_path=reference_audio,
+                    target_lang=target_lang,
+                    output_path=TEMP_DUBBED_AUDIO_PATH
+                )
+            else:
+                # Otherwise, use the regular text_to_speech function
+                from utils.tts import text_to_speech
+                
+                dubbed_audio_path = text_to_speech(
+                    translated_path, 
+                    TEMP_DUBBED_AUDIO_PATH, 
+                    language=target_lang,
+                    engine=tts_engine,
+                    reference_audio=reference_audio
+                )
             
-        dubbed_audio_size = get_file_size_mb(dubbed_audio_path)
-        print(f"📊 Oluşturulan ses dosyası boyutu: {dubbed_audio_size:.2f} MB")
-        print_stage_completion(5, "SESLER OLUŞTURULDU", step_time)
+            if not dubbed_audio_path:
+                print("❌ HATA: Metin sese dönüştürülemedi!")
+                logger.error("Failed to generate speech. Exiting.")
+                return None
+                
+            dubbed_audio_size = get_file_size_mb(dubbed_audio_path)
+            print(f"📊 Oluşturulan ses dosyası boyutu: {dubbed_audio_size:.2f} MB")
+            status.completed = True
         
         # Step 6: Merge the video with the new audio
-        print_stage_header(6, "VİDEO YENİ SESLE BİRLEŞTİRİLİYOR")
-        print(f"Video kaynağı: {video_path}")
-        print(f"Ses kaynağı: {dubbed_audio_path}")
-        print(f"Hedef: {OUTPUT_VIDEO_PATH}")
-        
-        step_start_time = time.time()
-        output_path = merge_video_audio(video_path, dubbed_audio_path, OUTPUT_VIDEO_PATH)
-        step_time = time.time() - step_start_time
-        
-        if not output_path:
-            print("❌ HATA: Video ve ses birleştirilemedi!")
-            logger.error("Failed to merge video and audio. Exiting.")
-            return None
+        with stage(6, "VİDEO YENİ SESLE BİRLEŞTİRİLİYOR", "VİDEO BİRLEŞTİRME TAMAMLANDI") as status:
+            if not video_path:
+                print(f"Video indiriliyor: {youtube_url}")
+                
+                from utils.downloader import download_youtube_video
+                
+                video_path = download_youtube_video(youtube_url, TEMP_VIDEO_PATH)
+                
+                if not video_path:
+                    print("❌ HATA: Video indirilemedi!")
+                    logger.error("Failed to download video. Exiting.")
+                    return None
+            
+            print(f"Video kaynağı: {video_path}")
+            print(f"Ses kaynağı: {dubbed_audio_path}")
+            print(f"Hedef: {OUTPUT_VIDEO_PATH}")
+            
+            from utils.video_merger import merge_video_audio
             
-        output_size = get_file_size_mb(output_path)
-        print(f"📊 Final video boyutu: {output_size:.2f} MB")
-        print_stage_completion(6, "VİDEO BİRLEŞTİRME TAMAMLANDI", step_time)
+            output_path = merge_video_audio(video_path, dubbed_audio_path, OUTPUT_VIDEO_PATH)
+            
+            if not output_path:
+                print("❌ HATA: Video ve ses birleştirilemedi!")
+                logger.error("Failed to merge video and audio. Exiting.")
+                return None
+                
+            output_size = get_file_size_mb(output_path)
+            print(f"📊 Final video boyutu: {output_size:.2f} MB")
+            status.completed = True
         
         # Process completed successfully
-        total_time = time.time() - total_start_time
+        total_time = time.perf_counter() - total_start_time
         
-        print("\n" + "=" * 80)
+        print("\n" + _SEP)
         print(f"🎉 AI DUBLAJ İŞLEMİ BAŞARIYLA TAMAMLANDI!")
         print(f"⏱️ Toplam işlem süresi: {format_time(total_time)} ({total_time:.2f} saniye)")
         print(f"💾 Çıktı video: {output_path}")
         print(f"📊 Final dosya boyutu: {output_size:.2f} MB")
-        print("=" * 80)
+        print(_SEP)
         
         logger.info("=" * 50)
         logger.info(f"AI dubbing process completed successfully!")
@@ -267,6 +332,8 @@ def process_video(youtube_url, source_lang=SOURCE_LANGUAGE, target_lang=TARGET_L
         logger.error(f"Unexpected error during dubbing process: {str(e)}")
         print(f"\n❌ HATA: İşlem sırasında beklenmeyen bir hata oluştu: {str(e)}")
         return None
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
 
 def parse_arguments():
     """Parse command line arguments."""
@@ -354,7 +421,13 @@ def main():
     if tts_engine.lower() == "voice_clone":
         # If record flag is set, record reference audio
         if args.record:
-            if not HAS_AUDIO_RECORDER:
+            try:
+                from utils.audio_recorder import record_audio, test_audio_device
+                has_audio_recorder = True
+            except ImportError:
+                has_audio_recorder = False
+            
+            if not has_audio_recorder:
                 print("\n❌ HATA: Ses kayıt özelliği kullanılamıyor. PyAudio kütüphanesi eksik.")
                 print("Lütfen 'pip install pyaudio' komutu ile yükleyin.")
                 return 1
@@ -0,0 +1,68 @@
+"""
+Tests for reading piped ffmpeg PCM in utils.audio_extractor.
+ffmpeg is replaced by a small Python child process, so only numpy is needed.
+"""
+
+import importlib.util
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add the project root to the path so we can import our modules
+sys.path.append(str(Path(__file__).parent))
+
+# Child process standing in for ffmpeg: writes int16 samples 0, 1, 2, ... to stdout
+_FAKE_FFMPEG = """
+import sys
+samples = int(sys.argv[1])
+sys.stderr.write("w" * int(sys.argv[2]))
+sys.stderr.flush()
+sys.stdout.buffer.write(b"".join((i % 32768).to_bytes(2, "little") for i in range(samples)))
+sys.exit(int(sys.argv[3]))
+"""
+
+@unittest.skipUnless(importlib.util.find_spec("numpy"), "numpy is not installed")
+class ReadAudioFfmpegTest(unittest.TestCase):
+    """_read_audio_ffmpeg must grow its buffer and never deadlock on ffmpeg's stderr."""
+    
+    def _read(self, samples, stderr_bytes=0, exit_code=0, duration=0.01):
+        from utils import audio_extractor
+        
+        real_popen = subprocess.Popen
+        
+        def fake_popen(cmd, **kwargs):
+            args = [sys.executable, "-c", _FAKE_FFMPEG, str(samples), str(stderr_bytes), str(exit_code)]
+            return real_popen(args, **kwargs)
+        
+        with mock.patch.object(audio_extractor, "get_media_duration", return_value=duration), \
+             mock.patch.object(audio_extractor.subprocess, "Popen", side_effect=fake_popen):
+            return audio_extractor._read_audio_ffmpeg("input.mp4", 16000, 1)
+    
+    def test_buffer_grows_past_the_estimated_duration(self):
+        # 0.01 s of duration preallocates ~1 s; three seconds of samples need two doublings
+        audio = self._read(48000)
+        self.assertEqual(audio.shape, (48000, 1))
+        self.assertEqual(audio[-1, 0], 47999 % 32768)
+        self.assertEqual(audio[1000, 0], 1000)
+    
+    def test_unknown_duration(self):
+        audio = self._read(1000, duration=None)
+        self.assertEqual(audio.shape, (1000, 1))
+    
+    def test_large_stderr_does_not_block(self):
+        # Far more than a pipe buffer of warnings before any samples are written
+        audio = self._read(16000, stderr_bytes=1 << 20)
+        self.assertEqual(audio.shape, (16000, 1))
+    
+    def test_failure_returns_none(self):
+        from utils import audio_extractor
+        
+        with self.assertLogs(audio_extractor.logger, "ERROR") as logs:
+            self.assertIsNone(self._read(100, stderr_bytes=1 << 20, exit_code=1))
+        # Only the tail of stderr is logged
+        self.assertLess(len(logs.output[0]), 2 * audio_extractor._STDERR_TAIL)
+
+if __name__ == "__main__":
+    unittest.main()
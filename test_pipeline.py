@@ -0,0 +1,129 @@
+"""
+Tests for the streaming transcribe-and-translate pipeline in utils.pipeline.
+Whisper and the translation services are replaced with plain functions,
+so these run without models or network access.
+"""
+
+import asyncio
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add the project root to the path so we can import our modules
+sys.path.append(str(Path(__file__).parent))
+
+def _echo(text, source_lang, target_lang):
+    return text.upper()
+
+def _import_pipeline():
+    """Import utils.pipeline with stand-ins for the Whisper and translator modules."""
+    transcriber = types.ModuleType("utils.transcriber")
+    transcriber.iter_segments = None
+    translator = types.ModuleType("utils.translator")
+    translator.translate_text_google = _echo
+    translator.translate_text_openai = _echo
+    
+    with mock.patch.dict(sys.modules, {"utils.transcriber": transcriber, "utils.translator": translator}):
+        sys.modules.pop("utils.pipeline", None)
+        from utils import pipeline
+        sys.modules.pop("utils.pipeline", None)
+    return pipeline
+
+pipeline = _import_pipeline()
+
+def _segments(*texts):
+    """iter_segments stand-in yielding (text, start, end) for the given texts."""
+    def iter_segments(audio, **options):
+        for text in texts:
+            yield text, 0.0, 0.0
+    return iter_segments
+
+class PipelineTest(unittest.TestCase):
+    """Translations are written in order, and failures never leave work behind."""
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.transcript_path = os.path.join(self.tmp_dir.name, "transcript.txt")
+        self.translated_path = os.path.join(self.tmp_dir.name, "translated.txt")
+    
+    def _run(self, segments, **kwargs):
+        with mock.patch.object(pipeline, "iter_segments", segments):
+            return pipeline.transcribe_and_translate(
+                "audio.wav", transcript_path=self.transcript_path,
+                translated_path=self.translated_path, engine="google", **kwargs)
+    
+    def test_sentences_are_translated_in_order(self):
+        segments = _segments("Hello", " world.", " How are", " you?", " Bye")
+        
+        # Later sentences finish first; the output must still follow the transcript
+        delays = {"Hello world.": 0.05, "How are you?": 0.0, "Bye": 0.02}
+        
+        def translate(text, source_lang, target_lang):
+            time.sleep(delays[text])
+            return text.upper()
+        
+        with mock.patch.dict(pipeline._TRANSLATORS, {"google": translate}):
+            self.assertEqual(self._run(segments), (self.transcript_path, self.translated_path))
+        
+        self.assertEqual(Path(self.transcript_path).read_text(encoding="utf-8"),
+                         "Hello world. How are you? Bye")
+        self.assertEqual(Path(self.translated_path).read_text(encoding="utf-8"),
+                         "HELLO WORLD. HOW ARE YOU? BYE")
+    
+    def test_failed_translation_fails_the_pipeline(self):
+        segments = _segments("One.", " Two.")
+        translate = lambda text, source_lang, target_lang: None if text == "Two." else text
+        with mock.patch.dict(pipeline._TRANSLATORS, {"google": translate}):
+            self.assertIsNone(self._run(segments))
+    
+    def test_consumer_error_cancels_in_flight_translations(self):
+        release = threading.Event()
+        started = []
+        
+        def translate(text, source_lang, target_lang):
+            started.append(text)
+            if text == "Boom.":
+                raise RuntimeError("translation service down")
+            release.wait(5)
+            return text
+        
+        async def run():
+            queue = asyncio.Queue()
+            for sentence in ("Boom.", "Slow one.", "Queued.", "Queued too."):
+                await queue.put(sentence)
+            await queue.put(pipeline._DONE)
+            
+            # The first translation fails while the second one is still running
+            with self.assertRaises(RuntimeError):
+                await pipeline._consume_sentences(queue, translate, "en", "tr",
+                                                  io.StringIO(), io.StringIO(), max_concurrency=2)
+            release.set()
+            
+            # Nothing the consumer created is still pending
+            current = asyncio.current_task()
+            self.assertEqual([task for task in asyncio.all_tasks() if task is not current], [])
+        
+        asyncio.run(run())
+        # The semaphore kept the queued sentences from ever starting
+        self.assertNotIn("Queued too.", started)
+    
+    def test_consumer_error_stops_the_producer(self):
+        segments = _segments(*(f" Sentence {i}." for i in range(1000)))
+        
+        def translate(text, source_lang, target_lang):
+            raise RuntimeError("translation service down")
+        
+        with mock.patch.dict(pipeline._TRANSLATORS, {"google": translate}):
+            # A full queue would block the producer forever if nothing drained it
+            self.assertIsNone(self._run(segments, queue_size=2))
+
+if __name__ == "__main__":
+    unittest.main()
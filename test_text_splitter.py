@@ -0,0 +1,82 @@
+"""
+Tests for the text normalization and chunking in utils.text_splitter.
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+# Add the project root to the path so we can import our modules
+sys.path.append(str(Path(__file__).parent))
+
+from utils.text_splitter import join_chunks, normalize_for_tts, split_text, split_text_with_separators
+
+class NormalizeForTtsTest(unittest.TestCase):
+    """normalize_for_tts must drop characters that only cost decoder steps."""
+    
+    def test_collapses_whitespace(self):
+        self.assertEqual(normalize_for_tts("  Hello,\n\n  world.\t"), "Hello, world.")
+    
+    def test_collapses_repeated_punctuation(self):
+        self.assertEqual(normalize_for_tts("Wait!!! Really??? Fine..."), "Wait! Really? Fine.")
+    
+    def test_folds_full_width_characters(self):
+        self.assertEqual(normalize_for_tts("ＡＢＣ！"), "ABC!")
+    
+    def test_empty(self):
+        self.assertEqual(normalize_for_tts(" \n "), "")
+
+class SplitTextTest(unittest.TestCase):
+    """split_text must respect max_chars and break on sentence boundaries."""
+    
+    def test_short_text_is_one_chunk(self):
+        self.assertEqual(split_text("One. Two? Three!", max_chars=100), ["One. Two? Three!"])
+    
+    def test_breaks_on_sentence_boundaries(self):
+        self.assertEqual(split_text("One two. Three four. Five.", max_chars=12),
+                         ["One two.", "Three four.", "Five."])
+    
+    def test_overlong_sentence_breaks_on_whitespace(self):
+        chunks = split_text("alpha beta gamma delta epsilon", max_chars=11)
+        self.assertEqual(chunks, ["alpha beta", "gamma delta", "epsilon"])
+    
+    def test_overlong_word_is_cut(self):
+        self.assertEqual(split_text("abcdefghij", max_chars=4), ["abcd", "efgh", "ij"])
+    
+    def test_chunks_never_exceed_max_chars(self):
+        text = " ".join(f"Sentence number {i} has a few words." for i in range(200))
+        for max_chars in (10, 50, 240, 4000):
+            chunks = split_text(text, max_chars=max_chars)
+            self.assertTrue(all(0 < len(chunk) <= max_chars for chunk in chunks))
+            self.assertEqual(" ".join(chunks).split(), text.split())
+    
+    def test_empty_text(self):
+        self.assertEqual(split_text(""), [])
+        self.assertEqual(split_text(" \n\n "), [])
+
+class SeparatorsTest(unittest.TestCase):
+    """Paragraph breaks must survive a split and join."""
+    
+    TEXT = "First sentence. Second one.\n\nNew paragraph here.\n   \nLast."
+    
+    def test_paragraphs_within_a_chunk(self):
+        self.assertEqual(split_text_with_separators(self.TEXT, max_chars=1000),
+                         [("First sentence. Second one.\n\nNew paragraph here.\n\nLast.", "")])
+    
+    def test_separators_between_chunks(self):
+        self.assertEqual(split_text_with_separators(self.TEXT, max_chars=20), [
+            ("First sentence.", " "),
+            ("Second one.", "\n\n"),
+            ("New paragraph here.", "\n\n"),
+            ("Last.", "")
+        ])
+    
+    def test_round_trip(self):
+        for max_chars in (5, 20, 30, 1000):
+            pieces = split_text_with_separators(self.TEXT, max_chars=max_chars)
+            chunks, separators = zip(*pieces)
+            self.assertEqual(join_chunks(chunks, separators),
+                             "First sentence. Second one.\n\nNew paragraph here.\n\nLast.")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+Tests for the mixed-precision helpers in utils._torch_compat.
+torch is replaced with a mock, so these run without PyTorch or a GPU.
+"""
+
+import os
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add the project root to the path so we can import our modules
+sys.path.append(str(Path(__file__).parent))
+
+from utils import _torch_compat
+
+class CudaAutocastTest(unittest.TestCase):
+    """cuda_autocast must only ever hand float16 to the TTS call sites."""
+    
+    def setUp(self):
+        self.torch = mock.MagicMock()
+        patcher = mock.patch.dict(sys.modules, {"torch": self.torch})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        _torch_compat.cuda_half_dtype.cache_clear()
+        self.addCleanup(_torch_compat.cuda_half_dtype.cache_clear)
+    
+    def _gpu(self, major):
+        self.torch.cuda.is_available.return_value = True
+        self.torch.cuda.is_bf16_supported.return_value = major >= 8
+        self.torch.cuda.get_device_capability.return_value = (major, 0)
+    
+    def test_bf16_capable_gpu_uses_fp16(self):
+        self._gpu(8)
+        _torch_compat.cuda_autocast()
+        self.torch.autocast.assert_called_once_with(device_type="cuda", dtype=self.torch.float16)
+    
+    def test_volta_uses_fp16(self):
+        self._gpu(7)
+        self.assertIs(_torch_compat.cuda_half_dtype(), self.torch.float16)
+    
+    def test_old_gpu_is_noop(self):
+        self._gpu(6)
+        with _torch_compat.cuda_autocast():
+            pass
+        self.torch.autocast.assert_not_called()
+    
+    def test_no_gpu_is_noop(self):
+        self.torch.cuda.is_available.return_value = False
+        with _torch_compat.cuda_autocast():
+            pass
+        self.torch.autocast.assert_not_called()
+
+class LimitCpuThreadsTest(unittest.TestCase):
+    """limit_cpu_threads must only limit torch's thread count for the enclosed block."""
+    
+    def setUp(self):
+        self.torch = mock.MagicMock()
+        self.threads = 8
+        self.torch.get_num_threads.side_effect = lambda: self.threads
+        self.torch.set_num_threads.side_effect = lambda n: setattr(self, "threads", n)
+        for patcher in (mock.patch.dict(sys.modules, {"torch": self.torch}),
+                        mock.patch.dict(os.environ)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        os.environ.pop("OMP_NUM_THREADS", None)
+    
+    def test_restores_the_thread_count(self):
+        with _torch_compat.limit_cpu_threads():
+            self.assertEqual(self.threads, 1)
+        self.assertEqual(self.threads, 8)
+        self.assertNotIn("OMP_NUM_THREADS", os.environ)
+    
+    def test_restores_after_an_error(self):
+        with self.assertRaises(RuntimeError):
+            with _torch_compat.limit_cpu_threads():
+                raise RuntimeError("inference failed")
+        self.assertEqual(self.threads, 8)
+    
+    def test_nested_blocks_restore_once(self):
+        with _torch_compat.limit_cpu_threads():
+            with _torch_compat.limit_cpu_threads():
+                pass
+            # The outer block is still running inference
+            self.assertEqual(self.threads, 1)
+        self.assertEqual(self.threads, 8)
+    
+    def test_explicit_omp_num_threads_is_respected(self):
+        os.environ["OMP_NUM_THREADS"] = "4"
+        with _torch_compat.limit_cpu_threads():
+            self.assertEqual(self.threads, 8)
+        self.torch.set_num_threads.assert_not_called()
+
+if __name__ == "__main__":
+    unittest.main()
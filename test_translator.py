@@ -0,0 +1,124 @@
+"""
+Tests for chunked file translation in utils.translator.
+requests, urllib3 and translatepy are replaced with stand-ins, and the per-chunk
+translation calls with plain functions, so these run without network access.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add the project root to the path so we can import our modules
+sys.path.append(str(Path(__file__).parent))
+
+def _import_translator():
+    """Import utils.translator with stand-ins for its HTTP and translation libraries."""
+    requests = types.ModuleType("requests")
+    requests.Session = mock.MagicMock
+    adapters = types.ModuleType("requests.adapters")
+    adapters.HTTPAdapter = mock.MagicMock
+    retry = types.ModuleType("urllib3.util.retry")
+    retry.Retry = mock.MagicMock
+    translatepy = types.ModuleType("translatepy")
+    translatepy.Translator = mock.MagicMock
+    
+    modules = {
+        "requests": requests,
+        "requests.adapters": adapters,
+        "urllib3": types.ModuleType("urllib3"),
+        "urllib3.util": types.ModuleType("urllib3.util"),
+        "urllib3.util.retry": retry,
+        "translatepy": translatepy
+    }
+    with mock.patch.dict(sys.modules, modules):
+        sys.modules.pop("utils.translator", None)
+        from utils import translator
+        sys.modules.pop("utils.translator", None)
+    return translator
+
+translator = _import_translator()
+
+TRANSCRIPT = "One fish. Two fish.\n\nRed fish. Blue fish. Old fish.\n\nNew fish swim."
+
+class TranslateFileTest(unittest.TestCase):
+    """translate_file must keep chunk order and paragraphs, and never leave a partial file."""
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.input_path = os.path.join(self.tmp_dir.name, "transcript.txt")
+        self.output_path = os.path.join(self.tmp_dir.name, "out", "translated.txt")
+        Path(self.input_path).write_text(TRANSCRIPT, encoding="utf-8")
+    
+    def _translate(self, engine):
+        return translator.translate_file(self.input_path, self.output_path, "en", "tr", engine)
+    
+    def _output(self):
+        return Path(self.output_path).read_text(encoding="utf-8")
+    
+    def test_openai_chunks_are_written_in_order(self):
+        # Earlier chunks finish last; the file must still follow the transcript
+        def translate(chunk, source_lang, target_lang):
+            time.sleep(0.05 if chunk.startswith("One") else 0.0)
+            return chunk.upper()
+        
+        with mock.patch.object(translator, "OPENAI_API_KEY", "sk-test"), \
+             mock.patch.object(translator, "_OPENAI_MAX_CHARS", 20), \
+             mock.patch.object(translator, "_translate_chunk_openai", side_effect=translate) as chunk_mock:
+            self.assertEqual(self._translate("openai"), self.output_path)
+        
+        self.assertEqual(chunk_mock.call_count, 4)
+        self.assertEqual(self._output(), TRANSCRIPT.upper())
+    
+    def test_google_sends_each_chunk_once(self):
+        with mock.patch.object(translator, "_GOOGLE_MAX_CHARS", 20), \
+             mock.patch.object(translator, "_translate_chunk_google",
+                               side_effect=lambda chunk, source_lang, target_lang: f"<{chunk}>") as chunk_mock:
+            self.assertEqual(self._translate("google"), self.output_path)
+        
+        chunks = [call.args[0] for call in chunk_mock.call_args_list]
+        self.assertEqual(chunks, ["One fish. Two fish.", "Red fish. Blue fish.", "Old fish.", "New fish swim."])
+        self.assertEqual(self._output(),
+                         "<One fish. Two fish.>\n\n<Red fish. Blue fish.> <Old fish.>\n\n<New fish swim.>")
+    
+    def test_failed_chunk_removes_the_partial_file(self):
+        translate = lambda chunk, source_lang, target_lang: None if chunk == "Old fish." else chunk
+        with mock.patch.object(translator, "_GOOGLE_MAX_CHARS", 20), \
+             mock.patch.object(translator, "_translate_chunk_google", side_effect=translate), \
+             self.assertLogs(translator.logger, "ERROR"):
+            self.assertIsNone(self._translate("google"))
+        self.assertFalse(os.path.exists(self.output_path))
+    
+    def test_error_removes_the_partial_file(self):
+        def translate(chunk, source_lang, target_lang):
+            if chunk == "Old fish.":
+                raise ConnectionError("service unavailable")
+            return chunk
+        
+        with mock.patch.object(translator, "_GOOGLE_MAX_CHARS", 20), \
+             mock.patch.object(translator, "_translate_chunk_google", side_effect=translate), \
+             self.assertLogs(translator.logger, "ERROR"):
+            self.assertIsNone(self._translate("google"))
+        self.assertFalse(os.path.exists(self.output_path))
+    
+    def test_unknown_engine(self):
+        with self.assertLogs(translator.logger, "ERROR"):
+            self.assertIsNone(self._translate("babelfish"))
+        self.assertFalse(os.path.exists(self.output_path))
+
+class TranslateTextGoogleTest(unittest.TestCase):
+    """translate_text_google must keep paragraph breaks between its chunks."""
+    
+    def test_paragraphs_are_kept(self):
+        with mock.patch.object(translator, "_GOOGLE_MAX_CHARS", 20), \
+             mock.patch.object(translator, "_translate_chunk_google",
+                               side_effect=lambda chunk, source_lang, target_lang: chunk.lower()):
+            self.assertEqual(translator.translate_text_google(TRANSCRIPT, "en", "tr"), TRANSCRIPT.lower())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+Tests for the ffmpeg helpers in utils.video_merger.
+PCM streaming is checked against a `cat` subprocess; concatenation needs ffmpeg itself.
+"""
+
+import importlib.util
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+import wave
+from pathlib import Path
+
+# Add the project root to the path so we can import our modules
+sys.path.append(str(Path(__file__).parent))
+
+from utils import video_merger
+
+@unittest.skipUnless(importlib.util.find_spec("numpy"), "numpy is not installed")
+@unittest.skipUnless(shutil.which("cat"), "cat is not available")
+class WritePcm16Test(unittest.TestCase):
+    """_write_pcm16 must work on a pipe, which can't seek."""
+    
+    def _through_pipe(self, audio):
+        # cat echoes the bytes into a file, so a large write never blocks on a full stdout pipe
+        with tempfile.TemporaryFile() as out:
+            process = subprocess.Popen(["cat"], stdin=subprocess.PIPE, stdout=out)
+            video_merger._write_pcm16(process.stdin, audio)
+            process.stdin.close()
+            self.assertEqual(process.wait(timeout=10), 0)
+            out.seek(0)
+            return out.read()
+    
+    def test_float_samples_are_clipped_and_scaled(self):
+        import numpy as np
+        
+        audio = np.array([0.0, 0.5, -0.5, 1.0, -1.0, 2.0, -2.0], dtype=np.float32)
+        data = self._through_pipe(audio)
+        samples = np.frombuffer(data, dtype="<i2")
+        np.testing.assert_array_equal(samples, [0, 16383, -16383, 32767, -32767, 32767, -32767])
+    
+    def test_int16_samples_are_written_unchanged(self):
+        import numpy as np
+        
+        audio = np.arange(-1000, 1000, dtype=np.int16)
+        data = self._through_pipe(audio)
+        np.testing.assert_array_equal(np.frombuffer(data, dtype="<i2"), audio)
+
+@unittest.skipUnless(shutil.which("ffmpeg"), "ffmpeg is not installed")
+class ConcatWavsTest(unittest.TestCase):
+    """concat_wavs_ffmpeg must append the inputs in order without re-encoding."""
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+    
+    def _wav(self, name, frames):
+        path = os.path.join(self.tmp_dir.name, name)
+        with wave.open(path, "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(16000)
+            wf.writeframes(frames)
+        return path
+    
+    def test_concatenates_in_order(self):
+        # A quote in the file name exercises the list-file escaping
+        first = self._wav("it's first.wav", b"\x01\x00" * 1600)
+        second = self._wav("second.wav", b"\x02\x00" * 3200)
+        out_path = os.path.join(self.tmp_dir.name, "out", "joined.wav")
+        
+        self.assertEqual(video_merger.concat_wavs_ffmpeg([first, second], out_path), out_path)
+        with wave.open(out_path, "rb") as wf:
+            self.assertEqual(wf.getnframes(), 4800)
+            frames = wf.readframes(wf.getnframes())
+        self.assertEqual(frames, b"\x01\x00" * 1600 + b"\x02\x00" * 3200)
+    
+    def test_missing_input_returns_none(self):
+        out_path = os.path.join(self.tmp_dir.name, "joined.wav")
+        missing = os.path.join(self.tmp_dir.name, "missing.wav")
+        with self.assertLogs(video_merger.logger, "ERROR"):
+            self.assertIsNone(video_merger.concat_wavs_ffmpeg([missing], out_path))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,31 +6,26 @@ This script demonstrates how to use the voice_cloner_fallback module.
 import os
 import sys
 from pathlib import Path
-import torch
 
 # Add the project root to the path so we can import our modules
 sys.path.append(str(Path(__file__).parent))
 
 # Register safe globals for PyTorch 2.6+ compatibility
-try:
-    from TTS.tts.configs.xtts_config import XttsConfig
-    torch.serialization.add_safe_globals([XttsConfig])
-except (ImportError, AttributeError):
-    # Handle cases where TTS is not installed or PyTorch version doesn't support add_safe_globals
-    pass
+from utils._torch_compat import register_tts_safe_globals
+register_tts_safe_globals()
 
 # Import our fallback voice cloner module
 from utils.voice_cloner_fallback import clone_voice_and_speak
 from utils.create_test_audio import create_test_audio
-from config.settings import OUTPUTS_DIR
+from utils.io_utils import ensure_dir
+from config.settings import OUTPUTS_DIR, ensure_outputs_dir
 
 def main():
     """Test the voice cloning module with different languages."""
     print("\n===== VOICE CLONING TEST (FALLBACK) =====")
     
     # Create a test reference audio if it doesn't exist
-    sample_dir = os.path.join(OUTPUTS_DIR, "samples")
-    os.makedirs(sample_dir, exist_ok=True)
+    sample_dir = ensure_dir(os.path.join(ensure_outputs_dir(), "samples"))
     sample_path = os.path.join(sample_dir, "test_reference_audio.wav")
     
     if not os.path.exists(sample_path):
@@ -0,0 +1,151 @@
+"""
+Tests for the gTTS transport in utils.voice_cloner_fallback.
+requests and gTTS are replaced with stand-ins, so these run without network access.
+"""
+
+import base64
+import os
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add the project root to the path so we can import our modules
+sys.path.append(str(Path(__file__).parent))
+
+def _import_fallback():
+    """Import utils.voice_cloner_fallback with stand-ins for requests and gTTS."""
+    requests = types.ModuleType("requests")
+    requests.Session = mock.MagicMock
+    adapters = types.ModuleType("requests.adapters")
+    adapters.HTTPAdapter = mock.MagicMock
+    requests.adapters = adapters
+    gtts = types.ModuleType("gtts")
+    gtts.gTTS = None
+    
+    modules = {"requests": requests, "requests.adapters": adapters, "gtts": gtts}
+    with mock.patch.dict(sys.modules, modules):
+        sys.modules.pop("utils.voice_cloner_fallback", None)
+        from utils import voice_cloner_fallback
+        sys.modules.pop("utils.voice_cloner_fallback", None)
+    return voice_cloner_fallback
+
+fallback = _import_fallback()
+
+def _response_text(*payloads):
+    """Body of a batchexecute response from Google's TTS endpoint, one line per payload."""
+    lines = [")]}'", ""]
+    for payload in payloads:
+        encoded = base64.b64encode(payload).decode("ascii")
+        lines.append(f'[["wrb.fr","jQ1olc","[\\"{encoded}\\"]",null,null,null,"generic"]]')
+    return "\n".join(lines)
+
+class ParseGttsAudioTest(unittest.TestCase):
+    """_parse_gtts_audio must decode what gTTS.stream() decodes."""
+    
+    def test_single_payload(self):
+        self.assertEqual(fallback._parse_gtts_audio(_response_text(b"ID3 mp3 frames")), b"ID3 mp3 frames")
+    
+    def test_payloads_are_joined_in_order(self):
+        text = _response_text(b"first", b"second")
+        self.assertEqual(fallback._parse_gtts_audio(text), b"firstsecond")
+    
+    def test_unrecognized_body(self):
+        self.assertIsNone(fallback._parse_gtts_audio(')]}\'\n\n[["wrb.fr","other",null]]'))
+
+class FetchGttsTest(unittest.TestCase):
+    """_fetch_gtts must fall back to gTTS's public transport when its internals don't match."""
+    
+    def _fetch(self, tts, response_text="unused"):
+        session = mock.MagicMock()
+        session.send.return_value.text = response_text
+        with mock.patch.object(fallback, "gTTS", return_value=tts), \
+             mock.patch.object(fallback, "_get_gtts_session", return_value=session):
+            return fallback._fetch_gtts("Hello.", "en")
+    
+    def _tts_with_internals(self):
+        tts = mock.MagicMock(spec=["write_to_fp", "_prepare_requests"])
+        tts.write_to_fp.side_effect = lambda fp: fp.write(b"public")
+        tts._prepare_requests.return_value = [mock.sentinel.request]
+        return tts
+    
+    def test_pooled_session(self):
+        tts = self._tts_with_internals()
+        self.assertEqual(self._fetch(tts, _response_text(b"pooled")), b"pooled")
+        tts.write_to_fp.assert_not_called()
+    
+    def test_unrecognized_response_uses_write_to_fp(self):
+        tts = self._tts_with_internals()
+        with self.assertLogs(fallback.logger, "WARNING"):
+            self.assertEqual(self._fetch(tts, "<html>changed</html>"), b"public")
+    
+    def test_missing_internals_use_write_to_fp(self):
+        tts = mock.MagicMock(spec=["write_to_fp"])
+        tts.write_to_fp.side_effect = lambda fp: fp.write(b"public")
+        self.assertEqual(self._fetch(tts), b"public")
+
+class DiskCacheTest(unittest.TestCase):
+    """The gTTS disk cache must stay under its size cap, evicting the least recently used entries."""
+    
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.cache_dir = tmp_dir.name
+        for patcher in (mock.patch.object(fallback, "_CACHE_DIR", self.cache_dir),
+                        mock.patch.object(fallback, "_DISK_CACHE_MAX_BYTES", 250)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        fallback._prune_disk_cache.cache_clear()
+        self.addCleanup(fallback._prune_disk_cache.cache_clear)
+    
+    def _entry(self, text, mtime):
+        path = fallback._cache_path(text, "en")
+        with open(path, "wb") as f:
+            f.write(b"x" * 100)
+        os.utime(path, (mtime, mtime))
+        return path
+    
+    def test_prunes_least_recently_used(self):
+        oldest = self._entry("oldest", 1000)
+        older = self._entry("older", 2000)
+        newest = self._entry("newest", 3000)
+        other = os.path.join(self.cache_dir, "notes.txt")
+        open(other, "wb").close()
+        
+        fallback._prune_disk_cache()
+        self.assertEqual([os.path.exists(path) for path in (oldest, older, newest, other)],
+                         [False, True, True, True])
+    
+    def test_reads_refresh_entries(self):
+        first = self._entry("first", 1000)
+        second = self._entry("second", 2000)
+        
+        # Reading the older entry makes the newer one the eviction candidate; the cache is
+        # pruned before the first write, so only one of the two entries fits
+        with mock.patch.object(fallback, "_DISK_CACHE_MAX_BYTES", 150), \
+             mock.patch.object(fallback, "_fetch_gtts", return_value=b"y" * 100) as fetch:
+            self.assertEqual(fallback._load_or_synthesize("first", "en"), b"x" * 100)
+            fallback._load_or_synthesize("third", "en")
+        fetch.assert_called_once_with("third", "en")
+        
+        self.assertTrue(os.path.exists(first))
+        self.assertFalse(os.path.exists(second))
+        self.assertTrue(os.path.exists(fallback._cache_path("third", "en")))
+    
+    def test_missing_cache_dir(self):
+        with mock.patch.object(fallback, "_CACHE_DIR", os.path.join(self.cache_dir, "missing")):
+            fallback._prune_disk_cache()
+
+class VoiceClonerTest(unittest.TestCase):
+    """VoiceCloner.synthesize must reject text with nothing to speak before touching the model."""
+    
+    def test_empty_text(self):
+        cloner = object.__new__(fallback.VoiceCloner)
+        for text in ("", "  \n\n ", "\u3000"):
+            with self.assertRaises(ValueError):
+                cloner.synthesize(text, "speaker.wav", "en", "out.wav")
+
+if __name__ == "__main__":
+    unittest.main()
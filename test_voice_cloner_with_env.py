@@ -5,6 +5,7 @@ This script demonstrates how to use the voice_cloner module with PyTorch 2.6+ co
 
 import os
 import sys
+from functools import lru_cache
 from pathlib import Path
 
 # Set environment variable to disable weights_only in PyTorch 2.6+
@@ -15,8 +16,32 @@ os.environ["TORCH_FULL_LOAD"] = "1"
 sys.path.append(str(Path(__file__).parent))
 
 # Import our modules after setting the environment variable
+from utils._torch_compat import register_tts_safe_globals
 from utils.create_test_audio import create_test_audio
-from config.settings import OUTPUTS_DIR
+from utils._xtts import XTTS_LANG_MAP, XTTS_MODEL_NAME
+from utils.io_utils import ensure_dir
+from config.settings import OUTPUTS_DIR, ensure_outputs_dir, get_settings
+
+# Register safe globals for PyTorch 2.6+ compatibility
+register_tts_safe_globals()
+
+@lru_cache(maxsize=1)
+def _get_tts(use_gpu):
+    """Load the XTTS v2 model once and reuse it for every test case."""
+    from TTS.api import TTS
+    
+    return TTS(model_name=XTTS_MODEL_NAME, gpu=use_gpu)
+
+def warm_up_tts(speaker_wav):
+    """
+    Run one short synthesis so CUDA context creation and kernel selection
+    are paid once, before the per-language test cases.
+    """
+    import torch
+    
+    tts = _get_tts(torch.cuda.is_available())
+    with torch.inference_mode():
+        tts.tts(text="Hello.", speaker_wav=speaker_wav, language="en")
 
 # Create a simple wrapper function for TTS that doesn't use the voice_cloner.py module directly
 # This allows us to bypass compatibility issues
@@ -25,49 +50,25 @@ def clone_voice_directly(text, speaker_wav, target_lang, output_path):
     Direct voice cloning using TTS and PyTorch environment variable.
     """
     import torch
-    from TTS.api import TTS
     
     print(f"[Direct Cloning] Using PyTorch {torch.__version__}")
-    print(f"[Direct Cloning] TORCH_FULL_LOAD={os.environ.get('TORCH_FULL_LOAD', 'Not Set')}")
-    
-    # Map language codes
-    lang_mapping = {
-        "en": "en",
-        "fr": "fr",
-        "tr": "tr",
-        "es": "es",
-        "it": "it",
-        "de": "de",
-        "pt": "pt",
-        "pl": "pl",
-        "ru": "ru",
-        "nl": "nl",
-        "cs": "cs",
-        "ar": "ar",
-        "zh": "zh-cn",
-        "ja": "ja",
-        "ko": "ko",
-        "hu": "hu"
-    }
+    print(f"[Direct Cloning] TORCH_FULL_LOAD={get_settings().torch_full_load or 'Not Set'}")
     
     # Get the XTTS language code
-    xtts_lang = lang_mapping.get(target_lang.lower(), "en")
+    xtts_lang = XTTS_LANG_MAP.get(target_lang.lower(), "en")
     
     try:
-        # Check if GPU is available
-        use_gpu = torch.cuda.is_available()
+        # Get the cached XTTS v2 model (loaded on the first call only)
+        tts = _get_tts(torch.cuda.is_available())
         
-        # Initialize TTS with XTTS v2 model
-        model_name = "tts_models/multilingual/multi-dataset/xtts_v2"
-        tts = TTS(model_name=model_name, gpu=use_gpu)
-        
-        # Generate speech with voice cloning
-        tts.tts_to_file(
-            text=text,
-            file_path=output_path,
-            speaker_wav=speaker_wav,
-            language=xtts_lang
-        )
+        # Generate speech with voice cloning (inference_mode skips autograd bookkeeping)
+        with torch.inference_mode():
+            tts.tts_to_file(
+                text=text,
+                file_path=output_path,
+                speaker_wav=speaker_wav,
+                language=xtts_lang
+            )
         
         # Return the output path if successful
         if os.path.exists(output_path):
@@ -84,8 +85,7 @@ def main():
     print("\n===== VOICE CLONING TEST (WITH ENV VARIABLE) =====")
     
     # Create a test reference audio if it doesn't exist
-    sample_dir = os.path.join(OUTPUTS_DIR, "samples")
-    os.makedirs(sample_dir, exist_ok=True)
+    sample_dir = ensure_dir(os.path.join(ensure_outputs_dir(), "samples"))
     sample_path = os.path.join(sample_dir, "test_reference_audio.wav")
     
     if not os.path.exists(sample_path):
@@ -94,6 +94,13 @@ def main():
     
     print(f"\nUsing reference audio: {sample_path}")
     
+    # Load and warm up the shared model once for all test cases
+    print("\nWarming up XTTS model...")
+    try:
+        warm_up_tts(sample_path)
+    except Exception as e:
+        print(f"⚠️ Warm-up failed: {str(e)}")
+    
     # Test texts in different languages
     test_cases = [
         {
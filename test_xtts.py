@@ -0,0 +1,117 @@
+"""
+Tests for the speaker latent cache in utils._xtts.
+torch and the XTTS model are replaced with stand-ins, so these run without PyTorch or TTS.
+"""
+
+import os
+import pickle
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add the project root to the path so we can import our modules
+sys.path.append(str(Path(__file__).parent))
+
+from utils import _xtts
+
+class _Latent:
+    """Stand-in for a latent tensor."""
+    
+    def __init__(self, name):
+        self.name = name
+    
+    def cpu(self):
+        return self
+    
+    def __eq__(self, other):
+        return isinstance(other, _Latent) and other.name == self.name
+
+def _fake_torch():
+    """torch stand-in whose save/load pickle to disk."""
+    torch = types.ModuleType("torch")
+    
+    def save(obj, path):
+        with open(path, "wb") as f:
+            pickle.dump(obj, f)
+    
+    def load(path, map_location=None, weights_only=False):
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    
+    torch.save = save
+    torch.load = load
+    return torch
+
+class _FakeXtts:
+    """Stand-in for the XTTS model, counting speaker encoder runs."""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def get_conditioning_latents(self, audio_path):
+        self.calls += 1
+        return _Latent(f"gpt{self.calls}"), _Latent(f"speaker{self.calls}")
+
+class SpeakerLatentsTest(unittest.TestCase):
+    """get_speaker_latents must re-encode a reference only when the file or model changes."""
+    
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.tmp_dir = tmp_dir.name
+        self.latents_dir = os.path.join(self.tmp_dir, "latents")
+        self.speaker_wav = os.path.join(self.tmp_dir, "speaker.wav")
+        self._write_speaker(b"RIFF" + b"\0" * 100, mtime=1000)
+        
+        for patcher in (mock.patch.dict(sys.modules, {"torch": _fake_torch()}),
+                        mock.patch.object(_xtts, "_LATENTS_DIR", self.latents_dir),
+                        mock.patch.dict(_xtts._SPEAKER_LATENTS, clear=True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.model = _FakeXtts()
+    
+    def _write_speaker(self, data, mtime):
+        with open(self.speaker_wav, "wb") as f:
+            f.write(data)
+        os.utime(self.speaker_wav, (mtime, mtime))
+    
+    def _latents(self, model_name=_xtts.XTTS_MODEL_NAME):
+        return _xtts.get_speaker_latents(self.model, self.speaker_wav, model_name)
+    
+    def test_memory_hit(self):
+        first = self._latents()
+        self.assertIs(self._latents(), first)
+        self.assertEqual(self.model.calls, 1)
+    
+    def test_disk_hit_after_restart(self):
+        first = self._latents()
+        _xtts._SPEAKER_LATENTS.clear()
+        
+        self.assertEqual(self._latents(), first)
+        self.assertEqual(self.model.calls, 1)
+        # No temporary files are left behind
+        self.assertEqual([name.endswith(".pt") for name in os.listdir(self.latents_dir)], [True])
+    
+    def test_changed_file_is_encoded_again(self):
+        self._latents()
+        self._write_speaker(b"RIFF" + b"\1" * 100, mtime=2000)
+        self._latents()
+        self.assertEqual(self.model.calls, 2)
+    
+    def test_changed_size_is_encoded_again(self):
+        self._latents()
+        self._write_speaker(b"RIFF" + b"\0" * 200, mtime=1000)
+        self._latents()
+        self.assertEqual(self.model.calls, 2)
+    
+    def test_other_model_is_encoded_again(self):
+        self._latents()
+        self._latents("tts_models/multilingual/multi-dataset/xtts_v1.1")
+        self.assertEqual(self.model.calls, 2)
+        self.assertEqual(len(os.listdir(self.latents_dir)), 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+"""
+PyTorch compatibility helpers for the AI Dubbing project.
+This module registers the Coqui TTS classes that PyTorch 2.6+ needs to load XTTS checkpoints,
+picks the mixed-precision settings supported by the current GPU and tunes CPU threading.
+"""
+
+import os
+import importlib
+import threading
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache
+
+# Classes pickled inside XTTS checkpoints: (module, class name)
+_XTTS_SAFE_GLOBALS = (
+    ("TTS.tts.configs.xtts_config", "XttsConfig"),
+    ("TTS.tts.models.xtts", "XttsAudioConfig"),
+    ("TTS.tts.models.xtts", "XttsArgs"),
+    ("TTS.config.shared_configs", "BaseDatasetConfig"),
+)
+
+@lru_cache(maxsize=1)
+def register_tts_safe_globals():
+    """
+    Register all XTTS config classes as safe globals for torch.load in a single call.
+    Cached, so the imports and the registration happen once per process.
+    Does nothing if TTS is not installed or PyTorch is older than 2.6.
+    """
+    import torch
+    
+    if not hasattr(torch.serialization, "add_safe_globals"):
+        # PyTorch version doesn't have add_safe_globals (version < 2.6)
+        return
+    
+    safe_globals = []
+    for module_name, class_name in _XTTS_SAFE_GLOBALS:
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError:
+            # TTS is not installed (or this class moved in another TTS version)
+            continue
+        if hasattr(module, class_name):
+            safe_globals.append(getattr(module, class_name))
+    
+    if safe_globals:
+        torch.serialization.add_safe_globals(safe_globals)
+
+@lru_cache(maxsize=1)
+def cuda_half_dtype():
+    """
+    Pick the half-precision dtype for CUDA inference: float16 on GPUs with fast fp16 math
+    (compute capability 7.0 and newer), otherwise None.
+    bfloat16 is never used: the TTS models call .numpy() on their outputs, and numpy has no bfloat16.
+    """
+    import torch
+    
+    if not torch.cuda.is_available():
+        return None
+    if torch.cuda.get_device_capability()[0] >= 7:
+        return torch.float16
+    return None
+
+def cuda_autocast():
+    """
+    Return an autocast context that runs CUDA ops in half precision (see cuda_half_dtype),
+    or a no-op context when there is no suitable GPU.
+    Weights stay in fp32; precision-sensitive ops are kept in fp32 by autocast.
+    """
+    dtype = cuda_half_dtype()
+    if dtype is None:
+        return nullcontext()
+    
+    import torch
+    return torch.autocast(device_type="cuda", dtype=dtype)
+
+def compile_forward(module):
+    """
+    Compile a module's forward with torch.compile in place. Patching forward (rather than
+    wrapping the module) keeps methods like generate() that call self(...) on the compiled path.
+    """
+    import torch
+    module.forward = torch.compile(module.forward, dynamic=True)
+
+# Nesting depth of limit_cpu_threads() blocks across threads, and the torch thread count
+# to restore when the outermost one exits
+_THREAD_LIMIT_LOCK = threading.Lock()
+_thread_limit_depth = 0
+_threads_before_limit = None
+
+@contextmanager
+def limit_cpu_threads():
+    """
+    Run the enclosed CPU inference with a single intra-op thread unless OMP_NUM_THREADS is
+    set explicitly. With the default thread count, contended OpenMP workers have been measured
+    to make CPU TTS inference up to 10x slower. torch's thread count is process-wide, so
+    concurrent and nested blocks share one limit and the previous count is restored when
+    the last of them exits.
+    """
+    global _thread_limit_depth, _threads_before_limit
+    
+    if os.environ.get("OMP_NUM_THREADS"):
+        yield
+        return
+    
+    import torch
+    with _THREAD_LIMIT_LOCK:
+        if _thread_limit_depth == 0:
+            _threads_before_limit = torch.get_num_threads()
+            torch.set_num_threads(1)
+        _thread_limit_depth += 1
+    try:
+        yield
+    finally:
+        with _THREAD_LIMIT_LOCK:
+            _thread_limit_depth -= 1
+            if _thread_limit_depth == 0:
+                torch.set_num_threads(_threads_before_limit)
+
+@lru_cache(maxsize=1)
+def limit_process_cpu_threads():
+    """
+    Permanently run this process with a single OpenMP/MKL thread unless OMP_NUM_THREADS is set.
+    Only for dedicated worker processes (e.g. process-pool initializers), since it also caps
+    inter-op threads, which can't be changed back. Cached, so it's applied once per process.
+    """
+    if os.environ.get("OMP_NUM_THREADS"):
+        return
+    
+    # Picked up by libraries and child processes that haven't initialized OpenMP yet
+    os.environ["OMP_NUM_THREADS"] = "1"
+    os.environ["MKL_NUM_THREADS"] = "1"
+    
+    import torch
+    torch.set_num_threads(1)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Can only be set before any inter-op parallel work has started
+        pass
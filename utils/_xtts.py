@@ -0,0 +1,132 @@
+"""
+Shared XTTS helpers for the voice cloning modules.
+This module loads Coqui TTS models once per process, caches the speaker conditioning
+latents of reference audio files and compiles the XTTS decoder and vocoder.
+torch and TTS are imported on first use, so importing it stays cheap.
+"""
+
+import os
+import hashlib
+import logging
+import threading
+from functools import lru_cache
+from types import MappingProxyType
+from utils._torch_compat import compile_forward
+from utils.io_utils import ensure_dir
+from config.settings import OUTPUTS_DIR
+
+logger = logging.getLogger(__name__)
+
+XTTS_MODEL_NAME = "tts_models/multilingual/multi-dataset/xtts_v2"
+
+# Longest text passed to a single XTTS inference call (XTTS warns above ~250 characters)
+XTTS_MAX_CHARS = 240
+
+# Map language codes to XTTS format
+XTTS_LANG_MAP = MappingProxyType({
+    "en": "en",
+    "fr": "fr",
+    "tr": "tr",
+    "es": "es",
+    "it": "it",
+    "de": "de",
+    "pt": "pt",
+    "pl": "pl",
+    "ru": "ru",
+    "nl": "nl",
+    "cs": "cs",
+    "ar": "ar",
+    "zh": "zh-cn",
+    "ja": "ja",
+    "ko": "ko",
+    "hu": "hu"
+})
+
+# XTTS conditioning latents, keyed by (model name, absolute path, mtime, size) of the
+# reference audio; kept in memory and persisted on disk so they survive restarts
+_SPEAKER_LATENTS = {}
+_LATENTS_DIR = os.path.join(OUTPUTS_DIR, "cache", "latents")
+
+def xtts_language(target_lang):
+    """Get the XTTS language code for a language code like 'en' or 'zh-CN' (English if unsupported)."""
+    return XTTS_LANG_MAP.get(target_lang[:2].lower(), "en")
+
+@lru_cache(maxsize=4)
+def get_tts(model_name, device):
+    """
+    Load a Coqui TTS model once per (model name, device) and reuse it across calls.
+    Cached models keep their weights in (GPU) memory for the life of the process.
+    
+    Args:
+        model_name (str): Coqui TTS model name
+        device (str): "cuda" or "cpu"
+    """
+    import torch
+    from TTS.api import TTS
+    
+    logger.info("Using PyTorch %s", torch.__version__)
+    logger.info("Loading %s on %s...", model_name, device)
+    return TTS(model_name=model_name, gpu=(device == "cuda"))
+
+def compile_xtts(tts):
+    """
+    Compile the XTTS decoder and vocoder forwards with torch.compile, once per loaded model.
+    Compilation happens lazily on the first inference call.
+    
+    Returns:
+        bool: Whether the model is compiled
+    """
+    if getattr(tts, "_compiled", False):
+        return True
+    
+    try:
+        xtts_model = tts.synthesizer.tts_model
+        compile_forward(xtts_model.gpt.gpt_inference)
+        compile_forward(xtts_model.hifigan_decoder)
+    except (AttributeError, RuntimeError) as e:
+        # torch.compile is missing (PyTorch < 2.0) or the module layout differs
+        logger.warning("Could not compile XTTS: %s", e)
+        return False
+    
+    tts._compiled = True
+    logger.info("XTTS decoder and vocoder will be compiled on first use")
+    return True
+
+def get_speaker_latents(xtts_model, speaker_wav, model_name=XTTS_MODEL_NAME, device="cpu"):
+    """
+    Get the (gpt_cond_latent, speaker_embedding) pair for a reference audio file.
+    The XTTS speaker encoder runs only for files not seen before (in this or an earlier run)
+    by the same model. The key comes from a stat() call, so a cached reference is never
+    read again until the file changes.
+    
+    Args:
+        xtts_model: Loaded XTTS model (tts.synthesizer.tts_model)
+        speaker_wav (str): Path to the reference audio
+        model_name (str): Coqui TTS model name the latents belong to
+        device (str): Device to load persisted latents onto
+    """
+    import torch
+    
+    stat = os.stat(speaker_wav)
+    key = (model_name, os.path.abspath(speaker_wav), stat.st_mtime_ns, stat.st_size)
+    
+    latents = _SPEAKER_LATENTS.get(key)
+    if latents is not None:
+        return latents
+    
+    digest = hashlib.blake2b("|".join(map(str, key)).encode("utf-8"), digest_size=16).hexdigest()
+    latents_path = os.path.join(_LATENTS_DIR, f"{digest}.pt")
+    if os.path.exists(latents_path):
+        latents = tuple(torch.load(latents_path, map_location=device, weights_only=True))
+    else:
+        logger.info("Computing speaker latents for %s", speaker_wav)
+        latents = xtts_model.get_conditioning_latents(audio_path=[speaker_wav])
+        
+        # Write to a temporary file first, so concurrent workers never load a partial entry
+        ensure_dir(_LATENTS_DIR)
+        tmp_path = f"{latents_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        torch.save(tuple(latent.cpu() for latent in latents), tmp_path)
+        os.replace(tmp_path, latents_path)
+    
+    _SPEAKER_LATENTS[key] = latents
+    return latents
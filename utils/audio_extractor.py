@@ -1,29 +1,236 @@
 """
 Audio extraction module for AI Dubbing project.
-This module handles extracting audio from video files using ffmpeg.
+This module handles extracting audio from video files using PyAV (libav bindings),
+falling back to an ffmpeg subprocess when PyAV is not installed.
 """
 
 import os
 import subprocess
+import tempfile
 import time
+import numpy as np
 from config.settings import TEMP_VIDEO_PATH, TEMP_AUDIO_PATH
+from utils.ffprobe import get_media_duration
+from utils.io_utils import ensure_dir, write_wav
 from utils.logger import setup_logger
 
+try:
+    import av
+    import soundfile  # Needed by write_wav
+    HAS_PYAV = True
+except ImportError:
+    HAS_PYAV = False
+
 logger = setup_logger(__name__)
 
-def extract_audio(video_path=TEMP_VIDEO_PATH, audio_path=TEMP_AUDIO_PATH, 
-                 sample_rate=16000, channels=1):
+# Bytes read from ffmpeg's stdout per readinto() call
+_READ_CHUNK_SIZE = 64 * 1024
+
+# How much of ffmpeg's stderr ends up in the log
+_STDERR_TAIL = 4096
+
+def _decode_audio_pyav(video_path, sample_rate, channels):
+    """
+    Decode and resample only the audio stream of a container using PyAV.
+    Video packets are skipped at demux time, so no video frames are decoded.
+    
+    Args:
+        video_path (str): Path to the input video file
+        sample_rate (int): Sampling rate for the decoded audio
+        channels (int): Number of output channels (1=mono, 2=stereo, ...), whatever the source layout
+    
+    Returns:
+        numpy.ndarray: int16 samples shaped (samples, channels)
+    """
+    with av.open(video_path) as container:
+        if not container.streams.audio:
+            raise ValueError(f"No audio stream found in {video_path}")
+        
+        stream = container.streams.audio[0]
+        stream.thread_type = "AUTO"  # Multithreaded decode
+        
+        # Any source layout (5.1, 7.1, ...) is downmixed to the requested channel count
+        resampler = av.AudioResampler(
+            format="s16",
+            layout=av.AudioLayout(channels),
+            rate=sample_rate
+        )
+        
+        chunks = []
+        for packet in container.demux(stream):
+            for frame in packet.decode():
+                for resampled_frame in resampler.resample(frame):
+                    chunks.append(resampled_frame.to_ndarray())
+        
+        # Flush the samples still buffered inside the resampler
+        for resampled_frame in resampler.resample(None):
+            chunks.append(resampled_frame.to_ndarray())
+    
+    if not chunks:
+        raise ValueError(f"No audio samples decoded from {video_path}")
+    
+    # Packed s16 frames come as (1, samples * channels), de-interleave to (samples, channels)
+    return np.concatenate(chunks, axis=1).reshape(-1, channels)
+
+def _read_audio_ffmpeg(video_path, sample_rate, channels):
+    """
+    Decode audio with an ffmpeg subprocess, piping raw PCM to stdout instead of a WAV file.
+    
+    Args:
+        video_path (str): Path to the input video file
+        sample_rate (int): Sampling rate for the decoded audio
+        channels (int): Number of audio channels (1=mono, 2=stereo)
+    
+    Returns:
+        numpy.ndarray: int16 samples shaped (samples, channels), or None if decoding failed
+    """
+    # -f s16le: Raw 16-bit PCM without a container, written to pipe:1 (stdout)
+    cmd = [
+        "ffmpeg",
+        "-nostdin",
+        "-hide_banner",
+        "-loglevel", "error",
+        "-threads", "0",
+        "-i", video_path,
+        "-map", "0:a:0",
+        "-vn",
+        "-f", "s16le",
+        "-acodec", "pcm_s16le",
+        "-ar", str(sample_rate),
+        "-ac", str(channels),
+        "pipe:1"
+    ]
+    
+    logger.debug(f"Running command: {' '.join(cmd)}")
+    
+    # Preallocate the sample buffer from the container duration so ffmpeg's output is
+    # read straight into it, instead of being collected into a bytes object and copied
+    duration = get_media_duration(video_path)
+    capacity = int((duration or 60) * sample_rate) + sample_rate  # One second of slack
+    buf = np.empty(capacity * channels, dtype=np.int16)
+    view = memoryview(buf).cast("B")
+    offset = 0
+    
+    # stderr goes to a temporary file: with both on pipes, ffmpeg could block writing
+    # warnings to a full stderr pipe while we block reading stdout
+    with tempfile.TemporaryFile() as stderr_file:
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr_file)
+        try:
+            with process.stdout:
+                while True:
+                    if offset == len(view):
+                        # Duration was unknown or underestimated, grow the buffer
+                        grown = np.empty(buf.size * 2, dtype=np.int16)
+                        grown[:buf.size] = buf
+                        buf = grown
+                        view = memoryview(buf).cast("B")
+                    
+                    read = process.stdout.readinto(view[offset:offset + _READ_CHUNK_SIZE])
+                    if not read:
+                        break
+                    offset += read
+        except BaseException:
+            process.kill()
+            process.wait()
+            raise
+        
+        if process.wait() != 0:
+            # Only the tail of stderr, where ffmpeg reports the failure
+            stderr_file.seek(0, os.SEEK_END)
+            stderr_file.seek(max(0, stderr_file.tell() - _STDERR_TAIL))
+            logger.error(f"Error extracting audio: {stderr_file.read().decode(errors='replace')}")
+            return None
+    
+    frames = offset // (buf.itemsize * channels)
+    return buf[:frames * channels].reshape(-1, channels)
+
+def _to_float32(samples):
+    """
+    Convert int16 (samples, channels) PCM into float32 in [-1, 1].
+    Mono audio is returned as a 1-D array, the layout Whisper expects; multi-channel
+    audio is returned as (channels, samples).
+    """
+    audio = samples.astype(np.float32)
+    audio *= 1.0 / 32768.0  # Scale in place instead of allocating another array
+    if audio.shape[1] == 1:
+        return audio[:, 0]
+    return audio.T
+
+def _extract_audio_ffmpeg(video_path, audio_path, sample_rate, channels):
     """
-    Extract audio from a video file using ffmpeg.
+    Extract audio from a video file using an ffmpeg subprocess.
     
     Args:
         video_path (str): Path to the input video file
         audio_path (str): Path to save the extracted audio
+        sample_rate (int): Sampling rate for the extracted audio
+        channels (int): Number of audio channels (1=mono, 2=stereo)
+    
+    Returns:
+        bool: True if extraction succeeded, False otherwise
+    """
+    # Prepare ffmpeg command
+    # -nostdin: Never read from stdin
+    # -hide_banner / -loglevel error: Only errors are written to stderr
+    # -threads 0: Let ffmpeg pick the number of decoding threads
+    # -y: Overwrite output file without asking
+    # -i: Input file
+    # -map 0:a:0: Only demux the first audio stream
+    # -vn: Disable video
+    # -acodec: Audio codec (pcm_s16le = 16-bit PCM)
+    # -ar: Audio sampling rate
+    # -ac: Audio channels
+    cmd = [
+        "ffmpeg",
+        "-nostdin",
+        "-hide_banner",
+        "-loglevel", "error",
+        "-threads", "0",
+        "-y",
+        "-i", video_path,
+        "-map", "0:a:0",
+        "-vn",
+        "-acodec", "pcm_s16le",
+        "-ar", str(sample_rate),
+        "-ac", str(channels),
+        audio_path
+    ]
+    
+    logger.debug(f"Running command: {' '.join(cmd)}")
+    
+    # Run the process; stdout is unused since output goes to a file,
+    # and stderr only carries errors now that the log level is lowered
+    result = subprocess.run(
+        cmd, 
+        stdout=subprocess.DEVNULL, 
+        stderr=subprocess.PIPE,
+        check=False
+    )
+    
+    # Check if process was successful
+    if result.returncode != 0:
+        logger.error(f"Error extracting audio: {result.stderr.decode()}")
+        return False
+    
+    return True
+
+def extract_audio(video_path=TEMP_VIDEO_PATH, audio_path=TEMP_AUDIO_PATH, 
+                 sample_rate=16000, channels=1, return_array=False):
+    """
+    Extract audio from a video file using PyAV, or ffmpeg if PyAV is unavailable.
+    
+    Args:
+        video_path (str): Path to the input video file
+        audio_path (str): Path to save the extracted audio (ignored if return_array is True)
         sample_rate (int): Sampling rate for the extracted audio (default: 16kHz for STT)
         channels (int): Number of audio channels (1=mono, 2=stereo)
+        return_array (bool): Return the audio as an in-memory float32 array instead of
+                             writing a WAV file, which skips a full write + re-read
+                             when the audio is passed straight to Whisper
     
     Returns:
-        str: Path to the extracted audio file, or None if extraction failed
+        str or numpy.ndarray: Path to the extracted audio file (or the float32 samples
+                              if return_array is True), or None if extraction failed
     """
     logger.info(f"Extracting audio from video: {video_path}")
     
@@ -32,45 +239,38 @@ def extract_audio(video_path=TEMP_VIDEO_PATH, audio_path=TEMP_AUDIO_PATH,
         logger.error(f"Video file not found: {video_path}")
         return None
     
-    # Create output directory if it doesn't exist
-    os.makedirs(os.path.dirname(audio_path), exist_ok=True)
-    
     try:
-        # Prepare ffmpeg command
-        # -y: Overwrite output file without asking
-        # -i: Input file
-        # -vn: Disable video
-        # -acodec: Audio codec (pcm_s16le = 16-bit PCM)
-        # -ar: Audio sampling rate
-        # -ac: Audio channels
-        cmd = [
-            "ffmpeg",
-            "-y",
-            "-i", video_path,
-            "-vn",
-            "-acodec", "pcm_s16le",
-            "-ar", str(sample_rate),
-            "-ac", str(channels),
-            audio_path
-        ]
-        
-        # Execute ffmpeg command
         start_time = time.time()
-        logger.debug(f"Running command: {' '.join(cmd)}")
         
-        # Run the process with output piped
-        process = subprocess.Popen(
-            cmd, 
-            stdout=subprocess.PIPE, 
-            stderr=subprocess.PIPE
-        )
+        # Prefer in-process decoding with PyAV, fall back to ffmpeg if unavailable or failing
+        samples = None
+        if HAS_PYAV:
+            try:
+                samples = _decode_audio_pyav(video_path, sample_rate, channels)
+            except Exception as e:
+                logger.warning(f"PyAV extraction failed: {str(e)}. Falling back to ffmpeg.")
+        
+        if return_array:
+            if samples is None:
+                samples = _read_audio_ffmpeg(video_path, sample_rate, channels)
+                if samples is None:
+                    return None
+            
+            audio = _to_float32(samples)
+            extraction_time = time.time() - start_time
+            
+            logger.info(f"Audio extracted successfully to memory ({audio.nbytes / (1024 * 1024):.2f} MB)")
+            logger.info(f"Extraction time: {extraction_time:.2f} seconds")
+            logger.info(f"Audio settings: {sample_rate}Hz, {channels} channel(s)")
+            
+            return audio
         
-        # Wait for process to complete
-        stdout, stderr = process.communicate()
+        # Create output directory if it doesn't exist (once per directory per process)
+        ensure_dir(os.path.dirname(audio_path))
         
-        # Check if process was successful
-        if process.returncode != 0:
-            logger.error(f"Error extracting audio: {stderr.decode()}")
+        if samples is not None:
+            write_wav(audio_path, samples, sample_rate)
+        elif not _extract_audio_ffmpeg(video_path, audio_path, sample_rate, channels):
             return None
         
         extraction_time = time.time() - start_time
@@ -89,6 +289,71 @@ def extract_audio(video_path=TEMP_VIDEO_PATH, audio_path=TEMP_AUDIO_PATH,
         logger.error(f"Unexpected error during audio extraction: {str(e)}")
         return None
 
+def extract_audio_from_url(url, audio_path=TEMP_AUDIO_PATH, sample_rate=16000, channels=1):
+    """
+    Download only the audio track of a video with yt-dlp and convert it to PCM WAV.
+    yt-dlp hands the audio stream straight to its ffmpeg post-processor, so the full
+    video is never downloaded, muxed to disk and demuxed again.
+    
+    Args:
+        url (str): URL of the video
+        audio_path (str): Path to save the extracted audio
+        sample_rate (int): Sampling rate for the extracted audio (default: 16kHz for STT)
+        channels (int): Number of audio channels (1=mono, 2=stereo)
+    
+    Returns:
+        str: Path to the extracted audio file, or None if extraction failed
+    """
+    logger.info(f"Downloading audio track from URL: {url}")
+    
+    try:
+        start_time = time.time()
+        
+        ensure_dir(os.path.dirname(audio_path))
+        
+        # yt-dlp appends the extension of the converted file itself
+        output_template = os.path.splitext(audio_path)[0] + ".%(ext)s"
+        
+        # -f bestaudio/best: Only fetch the audio stream when the site offers one
+        # -x --audio-format wav: Convert the stream to WAV with ffmpeg
+        # --postprocessor-args: Resample/downmix in the same ffmpeg pass
+        cmd = [
+            "yt-dlp",
+            "-f", "bestaudio/best",
+            "-x",
+            "--audio-format", "wav",
+            "--audio-quality", "0",
+            "--postprocessor-args", f"ExtractAudio+ffmpeg_o:-ar {sample_rate} -ac {channels}",
+            "--no-playlist",
+            "--quiet",
+            "--no-warnings",
+            "-o", output_template,
+            url
+        ]
+        
+        logger.debug(f"Running command: {' '.join(cmd)}")
+        
+        result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        if result.returncode != 0 or not os.path.exists(audio_path):
+            logger.error(f"Error downloading audio: {result.stderr.decode(errors='replace')}")
+            return None
+        
+        extraction_time = time.time() - start_time
+        file_size = os.path.getsize(audio_path) / (1024 * 1024)  # Convert to MB
+        
+        logger.info(f"Audio downloaded successfully to {audio_path}")
+        logger.info(f"Extraction time: {extraction_time:.2f} seconds, Size: {file_size:.2f} MB")
+        logger.info(f"Audio settings: {sample_rate}Hz, {channels} channel(s)")
+        
+        return audio_path
+    
+    except FileNotFoundError:
+        logger.error("yt-dlp not found. Please install it with: pip install yt-dlp")
+        return None
+    except Exception as e:
+        logger.error(f"Unexpected error during audio download: {str(e)}")
+        return None
+
 
 # Example usage
 if __name__ == "__main__":
@@ -5,16 +5,19 @@ This module handles recording audio from the microphone for voice cloning.
 
 import os
 import time
+import queue
 import pyaudio
+from functools import lru_cache
 import wave
 import tempfile
 from tqdm import tqdm
 from config.settings import OUTPUTS_DIR
+from utils.io_utils import ensure_dir
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
-def record_audio(output_path=None, sample_rate=16000, channels=1, duration=10):
+def record_audio(output_path=None, sample_rate=16000, channels=1, duration=10, chunk_size=4096):
     """
     Record audio from the microphone.
     
@@ -23,6 +26,8 @@ def record_audio(output_path=None, sample_rate=16000, channels=1, duration=10):
         sample_rate (int): Sample rate of the recording
         channels (int): Number of audio channels
         duration (int): Duration of the recording in seconds
+        chunk_size (int): Frames per PortAudio buffer (default 4096, ~256 ms at 16kHz);
+                          smaller values lower latency at the cost of more callbacks and CPU
         
     Returns:
         str: Path to the recorded audio file, or None if recording failed
@@ -30,97 +35,119 @@ def record_audio(output_path=None, sample_rate=16000, channels=1, duration=10):
     try:
         # If output path not provided, create one
         if not output_path:
-            os.makedirs(os.path.join(OUTPUTS_DIR, "samples"), exist_ok=True)
             timestamp = int(time.time())
             output_path = os.path.join(OUTPUTS_DIR, "samples", f"reference_audio_{timestamp}.wav")
         
         # Ensure directory exists
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        ensure_dir(os.path.dirname(output_path))
         
         # Set audio parameters
-        chunk = 1024  # Record in chunks of 1024 samples
         audio_format = pyaudio.paInt16  # 16-bit resolution
+        sample_width = pyaudio.get_sample_size(audio_format)  # Static lookup, 2 bytes for paInt16
+        frame_bytes = channels * sample_width
+        total_frames = int(sample_rate * duration)
+        frames_written = 0
         
-        logger.info(f"Starting audio recording: {output_path}")
-        print(f"\n🎙️ Ses kaydı başlatılıyor... ({duration} saniye)")
-        print("Lütfen konuşmaya başlayın...")
+        # Captured buffers, handed from PortAudio's callback thread to this thread;
+        # None marks the end of the recording
+        buffers = queue.Queue()
+        
+        logger.info("Starting audio recording (%d seconds): %s", duration, output_path)
+        logger.info("Please start speaking...")
         
         # Initialize PyAudio
         audio = pyaudio.PyAudio()
         
-        # Open stream
-        stream = audio.open(
-            format=audio_format,
-            channels=channels,
-            rate=sample_rate,
-            input=True,
-            frames_per_buffer=chunk
-        )
-        
-        frames = []
-        
-        # Create a progress bar
-        with tqdm(total=duration, desc="Kayıt", bar_format="{desc}: {percentage:3.0f}%|{bar}| {n_fmt}/{total_fmt} [saniye]") as pbar:
-            # Record for the specified duration
-            for i in range(0, int(sample_rate / chunk * duration)):
-                data = stream.read(chunk)
-                frames.append(data)
-                
-                # Update progress bar every second
-                if i % int(sample_rate / chunk) == 0:
-                    pbar.update(1)
-        
-        # Stop and close the stream
-        stream.stop_stream()
-        stream.close()
-        audio.terminate()
-        
-        # Save the audio file
+        # Open the WAV file before recording so captured buffers are streamed to disk
+        # instead of being held in memory; the header is patched with the length on close
         with wave.open(output_path, 'wb') as wf:
             wf.setnchannels(channels)
-            wf.setsampwidth(audio.get_sample_size(audio_format))
+            wf.setsampwidth(sample_width)
             wf.setframerate(sample_rate)
-            wf.writeframes(b''.join(frames))
+            
+            def callback(in_data, frame_count, time_info, status):
+                """Queue captured samples; runs on PortAudio's real-time thread, so no disk I/O here."""
+                nonlocal frames_written
+                n = min(frame_count, total_frames - frames_written)
+                buffers.put(in_data[:n * frame_bytes])
+                frames_written += n
+                if frames_written >= total_frames:
+                    buffers.put(None)
+                    return (None, pyaudio.paComplete)
+                return (None, pyaudio.paContinue)
+            
+            # Open stream in callback mode; PortAudio delivers buffers without a blocking read loop
+            stream = audio.open(
+                format=audio_format,
+                channels=channels,
+                rate=sample_rate,
+                input=True,
+                frames_per_buffer=chunk_size,
+                stream_callback=callback
+            )
+            
+            # Create a progress bar
+            with tqdm(total=duration, desc="Kayıt", bar_format="{desc}: {percentage:3.0f}%|{bar}| {n_fmt}/{total_fmt} [saniye]") as pbar:
+                start_time = time.monotonic()
+                stream.start_stream()
+                
+                # Write the queued buffers until the callback is done, ticking the progress bar
+                # from the clock
+                while True:
+                    try:
+                        data = buffers.get(timeout=0.25)
+                    except queue.Empty:
+                        # The stream also stops on its own, e.g. when the device goes away
+                        if not stream.is_active():
+                            break
+                    else:
+                        if data is None:
+                            break
+                        wf.writeframesraw(data)
+                    
+                    elapsed = min(int(time.monotonic() - start_time), duration)
+                    pbar.update(elapsed - pbar.n)
+                
+                pbar.update(duration - pbar.n)
+            
+            # Stop and close the stream
+            stream.stop_stream()
+            stream.close()
+        
+        audio.terminate()
         
-        logger.info(f"Audio recording saved to {output_path}")
-        print(f"\n✅ Kayıt tamamlandı: {output_path}")
+        logger.info("Audio recording saved to %s", output_path)
         
         # Get file size
         file_size = os.path.getsize(output_path) / (1024 * 1024)  # Convert to MB
-        logger.info(f"Recording size: {file_size:.2f} MB")
-        print(f"📊 Dosya boyutu: {file_size:.2f} MB")
+        logger.info("Recording size: %.2f MB", file_size)
         
         return output_path
         
     except Exception as e:
-        logger.error(f"Error recording audio: {str(e)}")
-        print(f"\n❌ HATA: Ses kaydedilemedi: {str(e)}")
+        logger.error("Error recording audio: %s", e)
         return None
 
+@lru_cache(maxsize=1)
 def test_audio_device():
     """
     Test if an audio input device is available.
+    The result is cached for the process, since initializing PortAudio is the slow part.
     
     Returns:
-        bool: True if at least one input device is available, False otherwise
+        bool: True if a default input device is available, False otherwise
     """
     try:
         audio = pyaudio.PyAudio()
-        device_count = audio.get_device_count()
-        
-        # Check if there's at least one input device
-        has_input = False
-        for i in range(device_count):
-            device_info = audio.get_device_info_by_index(i)
-            if device_info.get('maxInputChannels') > 0:
-                has_input = True
-                break
-                
-        audio.terminate()
-        return has_input
+        try:
+            # Raises IOError when there is no default input device
+            device_info = audio.get_default_input_device_info()
+            return device_info.get('maxInputChannels', 0) > 0
+        finally:
+            audio.terminate()
         
     except Exception as e:
-        logger.error(f"Error testing audio device: {str(e)}")
+        logger.error("Error testing audio device: %s", e)
         return False
 
 # Example usage
@@ -3,6 +3,7 @@ Test Audio Creator Script.
 Creates a sample reference audio file for voice cloning testing.
 """
 
+import io
 import os
 import sys
 
@@ -10,6 +11,7 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.settings import OUTPUTS_DIR
+from utils.io_utils import ensure_dir
 from gtts import gTTS
 
 def create_test_audio():
@@ -17,8 +19,7 @@ def create_test_audio():
     print("Creating test reference audio file...")
     
     # Create samples directory if it doesn't exist
-    samples_dir = os.path.join(OUTPUTS_DIR, "samples")
-    os.makedirs(samples_dir, exist_ok=True)
+    samples_dir = ensure_dir(os.path.join(OUTPUTS_DIR, "samples"))
     
     # Path for the test audio file
     test_audio_path = os.path.join(samples_dir, "test_reference_audio.wav")
@@ -27,22 +28,23 @@ def create_test_audio():
     test_text = "This is a test reference audio for voice cloning. Hello world!"
     tts = gTTS(text=test_text, lang="en", slow=False)
     
-    # Save as mp3 first (gtts can only output mp3)
-    temp_mp3_path = os.path.join(samples_dir, "temp.mp3")
-    tts.save(temp_mp3_path)
+    # gTTS only outputs MP3; keep it in memory instead of writing a temporary file
+    mp3_buffer = io.BytesIO()
+    tts.write_to_fp(mp3_buffer)
+    mp3_buffer.seek(0)
     
-    # Convert mp3 to wav using ffmpeg if available, otherwise keep the mp3
+    # Decode the MP3 in-process (libsndfile >= 1.1) and write 16-bit PCM WAV at its native rate
     try:
-        import subprocess
-        subprocess.run([
-            "ffmpeg", "-y", "-i", temp_mp3_path, "-acodec", "pcm_s16le", 
-            "-ar", "16000", "-ac", "1", test_audio_path
-        ], check=True)
-        os.remove(temp_mp3_path)
+        import soundfile as sf
+        from utils.io_utils import write_wav
+        data, sample_rate = sf.read(mp3_buffer, dtype="int16")
+        write_wav(test_audio_path, data, sample_rate)
         print(f"Created test reference audio file: {test_audio_path}")
     except Exception as e:
-        # If ffmpeg fails or isn't available, just use the mp3
-        test_audio_path = temp_mp3_path
+        # If decoding fails (e.g. older libsndfile without MP3 support), just use the mp3
+        test_audio_path = os.path.join(samples_dir, "test_reference_audio.mp3")
+        with open(test_audio_path, "wb") as f:
+            f.write(mp3_buffer.getvalue())
         print(f"Could not convert to WAV. Created MP3 instead: {test_audio_path}")
         print(f"Error: {str(e)}")
     
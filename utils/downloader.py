@@ -5,21 +5,26 @@ This module handles downloading videos from YouTube using pytube.
 
 import os
 import time
+import asyncio
 import requests
-import subprocess
+from collections import deque
 from pytube import YouTube
 from pytube.exceptions import PytubeError
 from tqdm import tqdm
 from config.settings import TEMP_VIDEO_PATH
+from utils.io_utils import ensure_dir
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
-def download_video_with_yt_dlp(url, output_path=TEMP_VIDEO_PATH, resolution="720"):
+async def download_video_with_yt_dlp_async(url, output_path=TEMP_VIDEO_PATH, resolution="720"):
     """
     Alternative method to download a YouTube video using yt-dlp (if installed).
     This is more robust than pytube for some videos.
     
+    The yt-dlp process is driven by the event loop, so an async caller can run other
+    coroutines (e.g. model loading in an executor) while the download is in progress.
+    
     Args:
         url (str): YouTube video URL
         output_path (str): Path to save the downloaded video
@@ -28,54 +33,63 @@ def download_video_with_yt_dlp(url, output_path=TEMP_VIDEO_PATH, resolution="720
     Returns:
         str: Path to the downloaded video file, or None if download failed
     """
+    process = None
     try:
         # Ensure output directory exists
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        ensure_dir(os.path.dirname(output_path))
         
-        logger.info(f"Attempting to download with yt-dlp: {url}")
-        print(f"⚠️ Pytube failed, trying alternative download method...")
+        logger.info("Attempting to download with yt-dlp: %s", url)
         
         # Construct yt-dlp command
         # -f: Format to download (here we're getting the best video with audio up to specified resolution)
         # -o: Output filename
         # --no-playlist: Don't download the playlist even if the URL points to one
+        # --newline: End every progress update with a newline; without a TTY yt-dlp
+        #            separates them with \r only, which never completes a line
         cmd = [
             "yt-dlp",
             "-f", f"best[height<={resolution}]",
             "-o", output_path,
             "--no-playlist",
+            "--newline",
             url
         ]
         
         # Execute the command
+        # stderr is merged into the stdout pipe, so a chatty stderr
+        # can never fill up and block the child while we read stdout
         start_time = time.time()
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT
         )
         
-        # Display progress
-        while process.poll() is None:
-            line = process.stdout.readline().strip()
-            if line and '[download]' in line and '%' in line:
-                print(f"\r{line}", end='', flush=True)
+        # Display progress, yielding to the event loop until the next full line arrives
+        output_tail = deque(maxlen=20)
+        while True:
+            line = await process.stdout.readline()
+            if not line:
+                break
+            line = line.decode(errors="replace")
+            if '[download]' in line and '%' in line:
+                print(f"\r{line.rstrip()}", end='', flush=True)
+            else:
+                output_tail.append(line)
                 
         # Get the return code
-        return_code = process.wait()
+        return_code = await process.wait()
         
         # Process the result
         if return_code != 0:
-            stderr = process.stderr.read()
-            logger.error(f"yt-dlp error: {stderr}")
+            logger.error("yt-dlp error: %s", ''.join(output_tail))
             return None
             
         download_time = time.time() - start_time
         file_size = os.path.getsize(output_path) / (1024 * 1024)
         
-        logger.info(f"Video downloaded successfully using yt-dlp to {output_path}")
-        logger.info(f"Download time: {download_time:.2f} seconds, Size: {file_size:.2f} MB")
+        logger.info("Video downloaded successfully using yt-dlp to %s", output_path)
+        logger.info("Download time: %.2f seconds, Size: %.2f MB", download_time, file_size)
         
         return output_path
         
@@ -83,8 +97,28 @@ def download_video_with_yt_dlp(url, output_path=TEMP_VIDEO_PATH, resolution="720
         logger.error("yt-dlp is not installed. Install it with 'pip install yt-dlp'")
         return None
     except Exception as e:
-        logger.error(f"Error using yt-dlp: {str(e)}")
+        logger.error("Error using yt-dlp: %s", e)
         return None
+    finally:
+        # Don't leave yt-dlp running when reading its output failed or we were cancelled
+        if process is not None and process.returncode is None:
+            process.kill()
+            await process.wait()
+
+def download_video_with_yt_dlp(url, output_path=TEMP_VIDEO_PATH, resolution="720"):
+    """
+    Synchronous wrapper around download_video_with_yt_dlp_async().
+    Must not be called from a running event loop; await the async version there instead.
+    
+    Args:
+        url (str): YouTube video URL
+        output_path (str): Path to save the downloaded video
+        resolution (str): Video resolution to download
+        
+    Returns:
+        str: Path to the downloaded video file, or None if download failed
+    """
+    return asyncio.run(download_video_with_yt_dlp_async(url, output_path, resolution))
 
 def download_youtube_video(url, output_path=TEMP_VIDEO_PATH, resolution="720p"):
     """
@@ -98,7 +132,7 @@ def download_youtube_video(url, output_path=TEMP_VIDEO_PATH, resolution="720p"):
     Returns:
         str: Path to the downloaded video file, or None if download failed
     """
-    logger.info(f"Downloading YouTube video: {url}")
+    logger.info("Downloading YouTube video: %s", url)
     
     try:
         # Create progress bar
@@ -117,7 +151,7 @@ def download_youtube_video(url, output_path=TEMP_VIDEO_PATH, resolution="720p"):
         
         # Create YouTube object with progress callback
         yt = YouTube(url, on_progress_callback=on_progress)
-        logger.info(f"Video title: {yt.title}")
+        logger.info("Video title: %s", yt.title)
         
         # Get the appropriate stream
         video_stream = yt.streams.filter(progressive=True, file_extension='mp4', 
@@ -125,11 +159,11 @@ def download_youtube_video(url, output_path=TEMP_VIDEO_PATH, resolution="720p"):
         
         # If requested resolution isn't available, get the highest one
         if not video_stream:
-            logger.warning(f"Resolution {resolution} not available. Getting highest resolution.")
+            logger.warning("Resolution %s not available. Getting highest resolution.", resolution)
             video_stream = yt.streams.filter(progressive=True, file_extension='mp4').order_by('resolution').desc().first()
         
         # Ensure output directory exists
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        ensure_dir(os.path.dirname(output_path))
         
         # Download the video
         start_time = time.time()
@@ -142,18 +176,18 @@ def download_youtube_video(url, output_path=TEMP_VIDEO_PATH, resolution="720p"):
         download_time = time.time() - start_time
         file_size = os.path.getsize(output_path) / (1024 * 1024)  # Convert to MB
         
-        logger.info(f"Video downloaded successfully to {output_path}")
-        logger.info(f"Download time: {download_time:.2f} seconds, Size: {file_size:.2f} MB")
+        logger.info("Video downloaded successfully to %s", output_path)
+        logger.info("Download time: %.2f seconds, Size: %.2f MB", download_time, file_size)
         
         return output_path
         
     except PytubeError as e:
-        logger.error(f"Error downloading YouTube video with pytube: {str(e)}")
+        logger.error("Error downloading YouTube video with pytube: %s", e)
         logger.info("Trying alternative download method...")
         # Try using yt-dlp as a fallback
         return download_video_with_yt_dlp(url, output_path, resolution.replace("p", ""))
     except Exception as e:
-        logger.error(f"Unexpected error during download: {str(e)}")
+        logger.error("Unexpected error during download: %s", e)
         # Try using yt-dlp as a fallback
         return download_video_with_yt_dlp(url, output_path, resolution.replace("p", ""))
 
@@ -0,0 +1,73 @@
+"""
+Media probing helpers for AI Dubbing project.
+This module wraps ffprobe to read container metadata without decoding any streams.
+"""
+
+import subprocess
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+def get_media_duration(media_path):
+    """
+    Get the duration of a media file from its container header using ffprobe.
+    
+    Args:
+        media_path (str): Path to the media file
+    
+    Returns:
+        float: Duration in seconds, or None if it could not be determined
+    """
+    cmd = [
+        "ffprobe",
+        "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=nokey=1:noprint_wrappers=1",
+        media_path
+    ]
+    
+    try:
+        result = subprocess.run(cmd, capture_output=True, check=False)
+        if result.returncode != 0:
+            logger.debug(f"ffprobe failed for {media_path}: {result.stderr.decode(errors='replace')}")
+            return None
+        
+        return float(result.stdout.decode().strip())
+    
+    except FileNotFoundError:
+        logger.debug("ffprobe not found in PATH")
+        return None
+    except ValueError:
+        # Streams without a duration in the header report "N/A"
+        return None
+
+def get_audio_codec(media_path):
+    """
+    Get the codec name of the first audio stream of a media file using ffprobe.
+    
+    Args:
+        media_path (str): Path to the media file
+    
+    Returns:
+        str: Codec name (e.g. "aac", "pcm_s16le"), or None if it could not be determined
+    """
+    cmd = [
+        "ffprobe",
+        "-v", "error",
+        "-select_streams", "a:0",
+        "-show_entries", "stream=codec_name",
+        "-of", "default=nokey=1:noprint_wrappers=1",
+        media_path
+    ]
+    
+    try:
+        result = subprocess.run(cmd, capture_output=True, check=False)
+        if result.returncode != 0:
+            logger.debug(f"ffprobe failed for {media_path}: {result.stderr.decode(errors='replace')}")
+            return None
+        
+        return result.stdout.decode().strip() or None
+    
+    except FileNotFoundError:
+        logger.debug("ffprobe not found in PATH")
+        return None
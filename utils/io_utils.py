@@ -0,0 +1,49 @@
+"""
+File I/O helpers for AI Dubbing project.
+This module creates output directories and writes generated audio to disk
+through large user-space buffers.
+"""
+
+import os
+
+# Directories already created by this process
+_ENSURED_DIRS = set()
+
+# Write buffer for audio files; a few seconds of 24kHz float audio fit in a single write
+_WAV_WRITE_BUFFER = 4 * 1024 * 1024
+
+def ensure_dir(path):
+    """
+    Create a directory (and its parents) unless this process already did,
+    so repeated writes to the same directory skip the makedirs syscalls.
+    
+    Args:
+        path (str): Directory path
+    
+    Returns:
+        str: The directory path
+    """
+    if path and path not in _ENSURED_DIRS:
+        os.makedirs(path, exist_ok=True)
+        _ENSURED_DIRS.add(path)
+    return path
+
+def write_wav(path, audio, sample_rate, subtype="PCM_16"):
+    """
+    Write audio samples to a WAV file through a 4 MB buffered file object,
+    so libsndfile's many small writes become a few large write() syscalls.
+    
+    Args:
+        path (str): Path to the output WAV file
+        audio (numpy.ndarray): Samples (float in [-1, 1] or integer PCM), shape (frames,) or (frames, channels)
+        sample_rate (int): Sample rate in Hz
+        subtype (str): soundfile subtype; 16-bit PCM by default, half the size of float32
+    
+    Returns:
+        str: Path to the written file
+    """
+    import soundfile as sf
+    
+    with open(path, "wb", buffering=_WAV_WRITE_BUFFER) as f:
+        sf.write(f, audio, sample_rate, format="WAV", subtype=subtype)
+    return path
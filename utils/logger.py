@@ -5,9 +5,10 @@ This module sets up a centralized logging system that writes to both console and
 
 import logging
 import sys
-import os
 from datetime import datetime
+from functools import lru_cache
 from config.settings import LOGS_DIR, LOG_LEVEL, LOG_FILE
+from utils.io_utils import ensure_dir
 
 # ANSI color codes for colored console output
 class Colors:
@@ -44,21 +45,39 @@ class ColoredFormatter(logging.Formatter):
         'CRITICAL': Colors.BG_RED + Colors.WHITE + Colors.BOLD
     }
     
+    # Colored level names, built once instead of per record
+    COLORED_LEVELNAMES = {
+        levelname: f"{color_code}{levelname}{Colors.RESET}"
+        for levelname, color_code in COLORS.items()
+    }
+    
     def format(self, record):
-        # Get the original formatted message
-        log_message = super().format(record)
+        # Swap in the colored level name while formatting, instead of searching
+        # the formatted message for it; other handlers still see the original name
+        levelname = record.levelname
+        colored_levelname = self.COLORED_LEVELNAMES.get(levelname)
+        if colored_levelname is None:
+            return super().format(record)
         
-        # Apply color to the level name if available
-        if record.levelname in self.COLORS:
-            color_code = self.COLORS[record.levelname]
-            colored_levelname = f"{color_code}{record.levelname}{Colors.RESET}"
-            log_message = log_message.replace(record.levelname, colored_levelname, 1)
-            
-        return log_message
+        record.levelname = colored_levelname
+        try:
+            return super().format(record)
+        finally:
+            record.levelname = levelname
+
+# Formatters are shared by every logger's handlers
+_FILE_FORMATTER = logging.Formatter(
+    '[%(asctime)s] %(levelname)s - %(name)s - %(message)s'
+)
+_CONSOLE_FORMATTER = ColoredFormatter(
+    '%(levelname)s: %(message)s'
+)
 
+@lru_cache(maxsize=None)
 def setup_logger(name):
     """
     Set up a logger with the given name that logs to both console and file.
+    Handlers are attached once per name; later calls return the cached logger.
     
     Args:
         name (str): Name of the logger, typically __name__ from the calling module
@@ -69,31 +88,19 @@ def setup_logger(name):
     # Create logger
     logger = logging.getLogger(name)
     
-    # Avoid adding handlers multiple times
-    if logger.handlers:
-        return logger
-    
     # Set level based on config
     level = getattr(logging, LOG_LEVEL)
     logger.setLevel(level)
     
-    # Create formatters
-    file_formatter = logging.Formatter(
-        '[%(asctime)s] %(levelname)s - %(name)s - %(message)s'
-    )
-    console_formatter = ColoredFormatter(
-        '%(levelname)s: %(message)s'
-    )
-    
     # Create console handler
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(console_formatter)
+    console_handler.setFormatter(_CONSOLE_FORMATTER)
     logger.addHandler(console_handler)
     
     # Create file handler
-    os.makedirs(LOGS_DIR, exist_ok=True)
+    ensure_dir(LOGS_DIR)
     file_handler = logging.FileHandler(LOG_FILE)
-    file_handler.setFormatter(file_formatter)
+    file_handler.setFormatter(_FILE_FORMATTER)
     logger.addHandler(file_handler)
     
     return logger
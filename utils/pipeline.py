@@ -0,0 +1,199 @@
+"""
+Streaming pipeline module for AI Dubbing project.
+This module overlaps transcription and translation: Whisper segments are grouped into
+sentences, and each sentence is translated while the following audio is still being decoded.
+"""
+
+import asyncio
+import os
+import re
+import time
+import threading
+from collections import deque
+from config.settings import (
+    TEMP_TRANSCRIPT_PATH,
+    TEMP_TRANSLATED_PATH,
+    SOURCE_LANGUAGE,
+    TARGET_LANGUAGE,
+    TRANSLATION_ENGINE
+)
+from utils.io_utils import ensure_dir
+from utils.logger import setup_logger
+from utils.transcriber import iter_segments
+from utils.translator import translate_text_google, translate_text_openai
+
+logger = setup_logger(__name__)
+
+# A sentence is complete once a segment ends with terminal punctuation (optionally quoted)
+_SENTENCE_END = re.compile(r"[.!?…][\"'”’)]*\s*$")
+
+_TRANSLATORS = {
+    "google": translate_text_google,
+    "openai": translate_text_openai
+}
+
+# Marks the end of the sentence stream in the queue
+_DONE = object()
+
+async def _produce_sentences(queue, stop, audio, **transcribe_options):
+    """
+    Run the Whisper segment iterator in a worker thread and put complete sentences
+    on the queue; blocking on a full queue keeps transcription from racing ahead.
+    Transcription ends early once the stop event (a threading.Event) is set.
+    """
+    loop = asyncio.get_running_loop()
+    
+    def put(sentence):
+        asyncio.run_coroutine_threadsafe(queue.put(sentence), loop).result()
+    
+    def transcribe():
+        parts = []
+        for text, _, _ in iter_segments(audio, **transcribe_options):
+            if stop.is_set():
+                return
+            parts.append(text)
+            if _SENTENCE_END.search(text):
+                put("".join(parts))
+                parts = []
+        if parts:
+            put("".join(parts))
+    
+    try:
+        await asyncio.to_thread(transcribe)
+    finally:
+        await queue.put(_DONE)
+
+async def _stop_producer(queue, stop, producer):
+    """
+    Stop the producer after the consumer failed: its thread exits at the next segment,
+    and the queue is drained so that a put blocked on the full queue can complete.
+    """
+    stop.set()
+    while not producer.done():
+        getter = asyncio.ensure_future(queue.get())
+        await asyncio.wait((getter, producer), return_when=asyncio.FIRST_COMPLETED)
+        getter.cancel()
+    
+    # The consumer's error is the one reported; just mark the producer's as retrieved
+    if not producer.cancelled():
+        producer.exception()
+
+async def _consume_sentences(queue, translate, source_lang, target_lang,
+                             transcript_file, translated_file, max_concurrency):
+    """
+    Translate sentences from the queue concurrently and write both files in order.
+    
+    Returns:
+        bool: True if every sentence was translated, False otherwise
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    pending = deque()
+    succeeded = True
+    separator = ""
+    
+    async def translate_one(sentence):
+        async with semaphore:
+            return await asyncio.to_thread(translate, sentence, source_lang, target_lang)
+    
+    def write(translated):
+        nonlocal succeeded, separator
+        if translated is None:
+            succeeded = False
+            return
+        translated_file.write(separator)
+        translated_file.write(translated)
+        separator = " "
+    
+    try:
+        while True:
+            sentence = await queue.get()
+            if sentence is _DONE:
+                break
+            
+            transcript_file.write(sentence)
+            pending.append(asyncio.create_task(translate_one(sentence.strip())))
+            
+            # Write the finished prefix of translations, keeping the original order
+            while pending and pending[0].done():
+                write(pending.popleft().result())
+        
+        while pending:
+            write(await pending.popleft())
+    finally:
+        # On failure, cancel the translations still in flight and retrieve their results,
+        # so none of them is left running or reports an unretrieved exception
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    
+    return succeeded
+
+async def transcribe_and_translate_async(audio, transcript_path=TEMP_TRANSCRIPT_PATH,
+                                         translated_path=TEMP_TRANSLATED_PATH,
+                                         source_lang=SOURCE_LANGUAGE, target_lang=TARGET_LANGUAGE,
+                                         engine=TRANSLATION_ENGINE, model=None,
+                                         queue_size=32, max_concurrency=8):
+    """
+    Transcribe audio and translate it sentence by sentence as the transcription progresses.
+    Total time approaches the slower of the two stages instead of their sum.
+    
+    Args:
+        audio (str or numpy.ndarray): Path to the audio file, or float32 16kHz mono samples
+        transcript_path (str): Path to save the transcript text file
+        translated_path (str): Path to save the translated text file
+        source_lang (str): Source language code
+        target_lang (str): Target language code
+        engine (str): Translation engine to use ('google' or 'openai')
+        model (optional): An already loaded Whisper model; loaded here if None
+        queue_size (int): Maximum number of sentences waiting for translation
+        max_concurrency (int): Maximum number of translation requests in flight
+    
+    Returns:
+        tuple: (transcript_path, translated_path), or None if the pipeline failed
+    """
+    translate = _TRANSLATORS.get(engine.lower())
+    if translate is None:
+        logger.error(f"Unknown translation engine: {engine}")
+        return None
+    
+    logger.info(f"Streaming transcription and translation ({source_lang} → {target_lang}) using {engine}")
+    
+    try:
+        start_time = time.time()
+        ensure_dir(os.path.dirname(transcript_path))
+        ensure_dir(os.path.dirname(translated_path))
+        
+        queue = asyncio.Queue(maxsize=queue_size)
+        stop = threading.Event()
+        with open(transcript_path, "w", encoding="utf-8", buffering=1 << 16) as transcript_file, \
+             open(translated_path, "w", encoding="utf-8", buffering=1 << 16) as translated_file:
+            producer = asyncio.create_task(
+                _produce_sentences(queue, stop, audio, model=model, language=source_lang))
+            try:
+                succeeded = await _consume_sentences(queue, translate, source_lang, target_lang,
+                                                     transcript_file, translated_file, max_concurrency)
+            except BaseException:
+                # Without a consumer the bounded queue never drains and the producer would block
+                await _stop_producer(queue, stop, producer)
+                raise
+            await producer
+        
+        if not succeeded:
+            logger.error("Translation failed")
+            return None
+        
+        logger.info(f"Transcription and translation completed in {time.time() - start_time:.2f} seconds")
+        logger.info(f"Transcript saved to {transcript_path}, translation saved to {translated_path}")
+        
+        return transcript_path, translated_path
+    
+    except Exception as e:
+        logger.error(f"Error in transcription/translation pipeline: {str(e)}")
+        return None
+
+def transcribe_and_translate(audio, **kwargs):
+    """
+    Synchronous wrapper around transcribe_and_translate_async().
+    Must not be called from a running event loop; await the async version there instead.
+    """
+    return asyncio.run(transcribe_and_translate_async(audio, **kwargs))
@@ -0,0 +1,117 @@
+"""
+Text splitting module for AI Dubbing project.
+This module normalizes text and splits long texts into sentence-aligned chunks
+for translation and speech synthesis.
+"""
+
+import re
+import unicodedata
+
+# Sentence boundary: whitespace following ., ! or ?
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+# Paragraph boundary: a line break followed by a blank line
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_PARAGRAPH_SEPARATOR = "\n\n"
+
+_WHITESPACE_RUN = re.compile(r"\s+")
+_REPEATED_PUNCTUATION = re.compile(r"([.!?])\1+")
+
+def normalize_for_tts(text):
+    """
+    Normalize text before speech synthesis: NFKC-fold compatibility characters
+    (e.g. full-width punctuation), collapse whitespace runs and repeated ., ! or ?.
+    Autoregressive TTS runs one decoder step per token, so dropped characters save time.
+    
+    Args:
+        text (str): Text to normalize
+    
+    Returns:
+        str: Normalized text
+    """
+    text = unicodedata.normalize("NFKC", text)
+    text = _WHITESPACE_RUN.sub(" ", text)
+    text = _REPEATED_PUNCTUATION.sub(r"\1", text)
+    return text.strip()
+
+def split_text_with_separators(text, max_chars=4000):
+    """
+    Split text into chunks of at most max_chars characters, breaking on sentence boundaries,
+    and pair each chunk with the separator that follows it in the text: "\n\n" where a
+    paragraph ends, a space within a paragraph and "" after the last chunk.
+    Paragraphs that share a chunk are joined with "\n\n" inside it.
+    Sentences longer than max_chars are broken on whitespace instead.
+    
+    Args:
+        text (str): Text to split
+        max_chars (int): Maximum number of characters per chunk
+    
+    Returns:
+        list: (chunk, separator) tuples with non-empty chunks, in order
+    """
+    pieces = []
+    current = ""
+    
+    for paragraph in _PARAGRAPH_BREAK.split(text.strip()):
+        # Separator between the text so far and the next sentence
+        joiner = _PARAGRAPH_SEPARATOR
+        
+        for sentence in _SENTENCE_BOUNDARY.split(paragraph.strip()):
+            if not sentence:
+                continue
+            
+            # Break overlong sentences on word boundaries
+            while len(sentence) > max_chars:
+                if current:
+                    pieces.append((current, joiner))
+                    current = ""
+                cut = sentence.rfind(" ", 0, max_chars + 1)
+                if cut > 0:
+                    pieces.append((sentence[:cut].rstrip(), " "))
+                else:
+                    # A word longer than max_chars is cut mid-word, with nothing between the pieces
+                    cut = max_chars
+                    pieces.append((sentence[:cut], ""))
+                sentence = sentence[cut:].strip()
+            if not sentence:
+                continue
+            
+            if current and len(current) + len(joiner) + len(sentence) > max_chars:
+                pieces.append((current, joiner))
+                current = sentence
+            else:
+                current = f"{current}{joiner}{sentence}" if current else sentence
+            joiner = " "
+    
+    if current:
+        pieces.append((current, ""))
+    
+    return pieces
+
+def split_text(text, max_chars=4000):
+    """
+    Split text into chunks of at most max_chars characters, breaking on sentence boundaries
+    (see split_text_with_separators).
+    
+    Args:
+        text (str): Text to split
+        max_chars (int): Maximum number of characters per chunk
+    
+    Returns:
+        list: Non-empty text chunks, in order
+    """
+    return [chunk for chunk, _ in split_text_with_separators(text, max_chars)]
+
+def join_chunks(chunks, separators):
+    """
+    Join (translated) chunks with the separators from split_text_with_separators,
+    restoring the paragraph breaks of the original text.
+    
+    Args:
+        chunks (list): Text chunks, in order
+        separators (list): Separator following each chunk
+    
+    Returns:
+        str: Joined text
+    """
+    return "".join(f"{chunk}{separator}" for chunk, separator in zip(chunks, separators))
@@ -1,65 +1,190 @@
 """
 Transcription module for AI Dubbing project.
-This module handles speech-to-text conversion using OpenAI's Whisper model.
+This module handles speech-to-text conversion using OpenAI's Whisper model,
+running it with faster-whisper (CTranslate2) when installed.
 """
 
 import os
 import time
+from functools import lru_cache
+import torch
 import whisper
-from config.settings import TEMP_AUDIO_PATH, TEMP_TRANSCRIPT_PATH, WHISPER_MODEL, SOURCE_LANGUAGE
+from config.settings import (
+    TEMP_AUDIO_PATH, TEMP_TRANSCRIPT_PATH, WHISPER_MODEL, WHISPER_BACKEND, SOURCE_LANGUAGE
+)
+from utils.io_utils import ensure_dir
 from utils.logger import setup_logger
 
+try:
+    from faster_whisper import WhisperModel
+    HAS_FASTER_WHISPER = True
+except ImportError:
+    HAS_FASTER_WHISPER = False
+
+try:
+    # Added in faster-whisper 1.1
+    from faster_whisper import BatchedInferencePipeline
+except ImportError:
+    BatchedInferencePipeline = None
+
 logger = setup_logger(__name__)
 
+@lru_cache(maxsize=2)
+def _get_model(model_name, device, backend):
+    """
+    Load a Whisper model once per (model name, device, backend).
+    Cached models keep their weights in (GPU) memory until clear_model_cache() is called.
+    """
+    start_time = time.time()
+    logger.info(f"Loading Whisper {model_name} model on {device} ({backend} backend)...")
+    if backend == "faster":
+        # CTranslate2 runs the model with INT8 weights
+        compute_type = "int8_float16" if device == "cuda" else "int8"
+        model = WhisperModel(model_name, device=device, compute_type=compute_type)
+    else:
+        model = whisper.load_model(model_name, device=device)
+    logger.info(f"Model loaded in {time.time() - start_time:.2f} seconds")
+    return model
+
+def load_model(model_name=WHISPER_MODEL, device=None, backend=WHISPER_BACKEND):
+    """
+    Load a Whisper model, reusing an already loaded one when possible.
+    
+    Args:
+        model_name (str): Whisper model size (tiny, base, small, medium, large)
+        device (str, optional): Device to load the model on; CUDA if available when None
+        backend (str): "faster" for faster-whisper (CTranslate2), "openai" for openai-whisper
+    
+    Returns:
+        faster_whisper.WhisperModel or whisper.Whisper: The loaded model
+    """
+    if backend == "faster" and not HAS_FASTER_WHISPER:
+        logger.warning("faster-whisper is not installed. Falling back to openai-whisper.")
+        backend = "openai"
+    if device is None:
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+    return _get_model(model_name, device, backend)
+
+def clear_model_cache():
+    """Drop the cached Whisper models and release the GPU memory they held."""
+    _get_model.cache_clear()
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+def _is_faster_model(model):
+    """Check whether a loaded model is a faster-whisper model."""
+    return HAS_FASTER_WHISPER and isinstance(model, WhisperModel)
+
+def _transcribe_faster(model, audio, language, batch_size):
+    """
+    Start a faster-whisper transcription and return its lazy segment iterator.
+    Segments are only decoded as the iterator is consumed.
+    """
+    if BatchedInferencePipeline is not None and batch_size > 1:
+        # VAD splits the audio into speech segments of up to 30 seconds, which are
+        # then decoded batch_size at a time; segments come back in audio order
+        pipeline = BatchedInferencePipeline(model=model)
+        segments, _ = pipeline.transcribe(audio, language=language or None,
+                                          batch_size=batch_size)
+    else:
+        # The VAD filter skips silent audio
+        segments, _ = model.transcribe(audio, language=language or None, vad_filter=True)
+    return segments
+
+def iter_segments(audio, model=None, model_name=WHISPER_MODEL, language=SOURCE_LANGUAGE,
+                  backend=WHISPER_BACKEND, batch_size=8):
+    """
+    Transcribe audio and yield its segments as they are decoded.
+    With faster-whisper each segment is yielded as soon as it is decoded, so later
+    stages (e.g. translation) can start before the whole file is transcribed;
+    openai-whisper only yields once the full transcription is done.
+    
+    Args:
+        audio (str or numpy.ndarray): Path to the audio file, or float32 16kHz mono samples
+        model (optional): An already loaded model; loaded here if None
+        model_name (str): Whisper model size (tiny, base, small, medium, large)
+        language (str): Language code for the audio (en, es, fr, etc.)
+        backend (str): Whisper backend used when the model is loaded here ("faster" or "openai")
+        batch_size (int): Segments decoded per forward pass with the faster-whisper batched pipeline
+    
+    Yields:
+        tuple: (text, start, end) of each segment, start/end in seconds
+    """
+    if model is None:
+        model = load_model(model_name, backend=backend)
+    
+    if _is_faster_model(model):
+        for segment in _transcribe_faster(model, audio, language, batch_size):
+            yield segment.text, segment.start, segment.end
+    else:
+        options = {"language": language} if language else {}
+        result = model.transcribe(audio, **options)
+        for segment in result["segments"]:
+            yield segment["text"], segment["start"], segment["end"]
+
 def transcribe_audio(audio_path=TEMP_AUDIO_PATH, output_path=TEMP_TRANSCRIPT_PATH, 
-                   model_name=WHISPER_MODEL, language=SOURCE_LANGUAGE):
+                   model_name=WHISPER_MODEL, language=SOURCE_LANGUAGE, model=None,
+                   backend=WHISPER_BACKEND, batch_size=8):
     """
     Transcribe audio file to text using OpenAI's Whisper model.
     
     Args:
-        audio_path (str): Path to the input audio file
+        audio_path (str or numpy.ndarray): Path to the input audio file, or float32
+                                           16kHz mono samples already in memory
         output_path (str): Path to save the transcript text file
         model_name (str): Whisper model size (tiny, base, small, medium, large)
         language (str): Language code for the audio (en, es, fr, etc.)
+        model (optional): An already loaded model (e.g. preloaded in the background);
+                          loaded here if None
+        backend (str): Whisper backend used when the model is loaded here ("faster" or "openai")
+        batch_size (int): Number of speech segments decoded per forward pass with the
+                          faster-whisper batched pipeline (1 disables batching)
     
     Returns:
         str: Path to the transcript file, or None if transcription failed
     """
-    logger.info(f"Transcribing audio: {audio_path} using Whisper {model_name} model")
+    # In-memory audio is handed to Whisper as-is, skipping its ffmpeg decode
+    is_array = not isinstance(audio_path, str)
+    audio_source = "in-memory audio" if is_array else audio_path
+    logger.info(f"Transcribing audio: {audio_source} using Whisper {model_name} model")
     
     # Check if audio file exists
-    if not os.path.exists(audio_path):
+    if not is_array and not os.path.exists(audio_path):
         logger.error(f"Audio file not found: {audio_path}")
         return None
     
     try:
-        # Load the Whisper model
-        start_time = time.time()
-        logger.info(f"Loading Whisper {model_name} model...")
-        model = whisper.load_model(model_name)
-        logger.info(f"Model loaded in {time.time() - start_time:.2f} seconds")
+        # Load the Whisper model unless one was passed in
+        if model is None:
+            model = load_model(model_name, backend=backend)
         
         # Transcribe the audio
         logger.info("Starting transcription...")
         transcription_start = time.time()
         
-        # Set transcription options
-        options = {}
-        if language:
-            options["language"] = language
-        
-        # Perform transcription
-        result = model.transcribe(audio_path, **options)
+        if _is_faster_model(model):
+            segments = _transcribe_faster(model, audio_path, language, batch_size)
+            transcript = "".join(segment.text for segment in segments)
+        else:
+            # Set transcription options
+            options = {}
+            if language:
+                options["language"] = language
+            
+            # Perform transcription
+            result = model.transcribe(audio_path, **options)
+            
+            # Extract the transcribed text and drop the segment list before writing,
+            # so its memory is released as soon as the last reference goes away
+            transcript = result["text"]
+            del result
         
         transcription_time = time.time() - transcription_start
         logger.info(f"Transcription completed in {transcription_time:.2f} seconds")
         
-        # Extract the transcribed text
-        transcript = result["text"]
-        
         # Save transcription to file
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        with open(output_path, "w", encoding="utf-8") as f:
+        ensure_dir(os.path.dirname(output_path))
+        with open(output_path, "w", encoding="utf-8", buffering=1 << 16) as f:
             f.write(transcript)
         
         logger.info(f"Transcript saved to {output_path}")
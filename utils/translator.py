@@ -5,8 +5,11 @@ This module handles text translation using Google Translate (unofficial) or Open
 
 import os
 import time
-import json
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from translatepy import Translator as TranslatePyTranslator
 from config.settings import (
     TEMP_TRANSCRIPT_PATH, 
@@ -16,10 +19,56 @@ from config.settings import (
     TRANSLATION_ENGINE,
     OPENAI_API_KEY
 )
+from utils.io_utils import ensure_dir
 from utils.logger import setup_logger
+from utils.text_splitter import join_chunks, split_text_with_separators
 
 logger = setup_logger(__name__)
 
+# Maximum number of concurrent OpenAI requests per translation
+_OPENAI_MAX_WORKERS = 8
+
+def _create_openai_session():
+    """
+    Create a keep-alive session for the OpenAI API, so DNS lookup and the TLS handshake
+    happen once per process; rate limits and server errors are retried with backoff.
+    """
+    session = requests.Session()
+    session.headers.update({"Authorization": f"Bearer {OPENAI_API_KEY}"})
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"POST"})
+    )
+    adapter = HTTPAdapter(
+        pool_connections=_OPENAI_MAX_WORKERS,
+        pool_maxsize=_OPENAI_MAX_WORKERS,
+        max_retries=retry
+    )
+    session.mount("https://", adapter)
+    return session
+
+_SESSION = _create_openai_session()
+
+# Longest text sent to Google Translate and to OpenAI in a single request
+_GOOGLE_MAX_CHARS = 4500
+_OPENAI_MAX_CHARS = 4000
+
+@lru_cache(maxsize=1)
+def _get_google_translator():
+    """Create the translatepy translator once and reuse its services and HTTP sessions."""
+    return TranslatePyTranslator()
+
+def _translate_chunk_google(chunk, source_lang, target_lang):
+    """
+    Translate one chunk of text (up to _GOOGLE_MAX_CHARS characters) with a single Google request.
+    
+    Returns:
+        str: Translated text
+    """
+    return _get_google_translator().translate(chunk, target_lang, source_lang).result
+
 def translate_text_google(text, source_lang=SOURCE_LANGUAGE, target_lang=TARGET_LANGUAGE):
     """
     Translate text using Google Translate via translatepy.
@@ -34,13 +83,57 @@ def translate_text_google(text, source_lang=SOURCE_LANGUAGE, target_lang=TARGET_
     """
     try:
         logger.info(f"Translating text using Google Translate ({source_lang} → {target_lang})")
-        translator = TranslatePyTranslator()
-        result = translator.translate(text, source_lang, target_lang)
-        return result.result
+        
+        # The web endpoint rejects very long inputs, so translate sentence-aligned chunks
+        pieces = split_text_with_separators(text, max_chars=_GOOGLE_MAX_CHARS)
+        translated_chunks = [_translate_chunk_google(chunk, source_lang, target_lang) for chunk, _ in pieces]
+        return join_chunks(translated_chunks, [separator for _, separator in pieces])
     except Exception as e:
         logger.error(f"Error translating with Google: {str(e)}")
         return None
 
+def _has_openai_key():
+    """Check that an OpenAI API key is configured, logging an error if it isn't."""
+    if not OPENAI_API_KEY:
+        logger.error("OpenAI API key not found. Please set it in settings.py or environment variables.")
+        return False
+    return True
+
+def _translate_chunk_openai(chunk, source_lang, target_lang):
+    """
+    Translate one chunk of text (up to _OPENAI_MAX_CHARS characters) with a single OpenAI request.
+    
+    Returns:
+        str: Translated text, or None if the response has no translation
+    """
+    # Create system message for controlling translation behavior
+    system_message = f"You are a professional translator. Translate the following text from {source_lang} to {target_lang}. Keep the text structure and formatting intact. Only return the translated text, no explanations or additional text."
+    
+    data = {
+        "model": "gpt-3.5-turbo",
+        "messages": [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": chunk}
+        ],
+        "temperature": 0.3,  # Lower temperature for more consistent translations
+        "max_tokens": len(chunk) // 2 + 512  # Sized to the chunk instead of a fixed cap
+    }
+    
+    # Make API request
+    response = _SESSION.post(
+        "https://api.openai.com/v1/chat/completions",
+        json=data,
+        timeout=60
+    )
+    
+    # Parse response
+    response_data = response.json()
+    if "choices" in response_data and len(response_data["choices"]) > 0:
+        return response_data["choices"][0]["message"]["content"].strip()
+    
+    logger.error(f"Unexpected response from OpenAI: {response_data}")
+    return None
+
 def translate_text_openai(text, source_lang=SOURCE_LANGUAGE, target_lang=TARGET_LANGUAGE):
     """
     Translate text using OpenAI's GPT model.
@@ -53,47 +146,25 @@ def translate_text_openai(text, source_lang=SOURCE_LANGUAGE, target_lang=TARGET_
     Returns:
         str: Translated text
     """
-    if not OPENAI_API_KEY:
-        logger.error("OpenAI API key not found. Please set it in settings.py or environment variables.")
+    if not _has_openai_key():
         return None
         
     try:
         logger.info(f"Translating text using OpenAI GPT ({source_lang} → {target_lang})")
         
-        # Prepare request to OpenAI API
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {OPENAI_API_KEY}"
-        }
+        # Split on sentence boundaries so long transcripts are not truncated by max_tokens,
+        # and translate the chunks concurrently over the shared session
+        pieces = split_text_with_separators(text, max_chars=_OPENAI_MAX_CHARS)
+        logger.info(f"Translating {len(pieces)} chunk(s) with up to {_OPENAI_MAX_WORKERS} concurrent requests")
         
-        # Create system message for controlling translation behavior
-        system_message = f"You are a professional translator. Translate the following text from {source_lang} to {target_lang}. Keep the text structure and formatting intact. Only return the translated text, no explanations or additional text."
+        with ThreadPoolExecutor(max_workers=_OPENAI_MAX_WORKERS) as executor:
+            translated_chunks = list(executor.map(
+                lambda piece: _translate_chunk_openai(piece[0], source_lang, target_lang), pieces))
         
-        data = {
-            "model": "gpt-3.5-turbo",
-            "messages": [
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": text}
-            ],
-            "temperature": 0.3,  # Lower temperature for more consistent translations
-            "max_tokens": 2048   # Adjust as needed
-        }
-        
-        # Make API request
-        response = requests.post(
-            "https://api.openai.com/v1/chat/completions",
-            headers=headers,
-            data=json.dumps(data)
-        )
-        
-        # Parse response
-        response_data = response.json()
-        if "choices" in response_data and len(response_data["choices"]) > 0:
-            translated_text = response_data["choices"][0]["message"]["content"].strip()
-            return translated_text
-        else:
-            logger.error(f"Unexpected response from OpenAI: {response_data}")
+        if any(chunk is None for chunk in translated_chunks):
             return None
+        
+        return join_chunks(translated_chunks, [separator for _, separator in pieces])
             
     except Exception as e:
         logger.error(f"Error translating with OpenAI: {str(e)}")
@@ -123,9 +194,9 @@ def translate_file(input_path=TEMP_TRANSCRIPT_PATH, output_path=TEMP_TRANSLATED_
         return None
     
     try:
-        # Read input file
-        with open(input_path, "r", encoding="utf-8") as f:
-            text = f.read()
+        # Read input file as bytes and decode once, skipping the TextIOWrapper decoder
+        with open(input_path, "rb") as f:
+            text = f.read().decode("utf-8")
         
         logger.info(f"Loaded text from {input_path} ({len(text)} characters)")
         
@@ -133,27 +204,60 @@ def translate_file(input_path=TEMP_TRANSCRIPT_PATH, output_path=TEMP_TRANSLATED_
         start_time = time.time()
         
         if engine.lower() == "google":
-            translated_text = translate_text_google(text, source_lang, target_lang)
+            translate = _translate_chunk_google
+            max_chars = _GOOGLE_MAX_CHARS
+            max_workers = 1  # The unofficial endpoint rate-limits concurrent requests
         elif engine.lower() == "openai":
-            translated_text = translate_text_openai(text, source_lang, target_lang)
+            if not _has_openai_key():
+                return None
+            # Each chunk is a single request, so this pool is the only level of concurrency
+            # and stays within the session's connection pool
+            translate = _translate_chunk_openai
+            max_chars = _OPENAI_MAX_CHARS
+            max_workers = _OPENAI_MAX_WORKERS
         else:
             logger.error(f"Unknown translation engine: {engine}")
             return None
-            
-        if translated_text is None:
+        
+        # Translate sentence-aligned chunks, one request each, and write each one as soon as
+        # it (and all chunks before it) are done, instead of holding the full translation in memory
+        pieces = split_text_with_separators(text, max_chars=max_chars)
+        del text
+        
+        ensure_dir(os.path.dirname(output_path))
+        translated_length = 0
+        failed = False
+        try:
+            with open(output_path, "wb", buffering=1 << 16) as f, \
+                 ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = executor.map(lambda piece: translate(piece[0], source_lang, target_lang), pieces)
+                for (_, separator), translated_chunk in zip(pieces, results):
+                    if translated_chunk is None:
+                        failed = True
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        break
+                    
+                    # Paragraph breaks of the transcript are kept between chunks
+                    translated_chunk += separator
+                    f.write(translated_chunk.encode("utf-8"))
+                    f.flush()
+                    translated_length += len(translated_chunk)
+        except BaseException:
+            # Don't leave a partial translation behind for later steps to pick up
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            raise
+        
+        if failed:
             logger.error("Translation failed")
+            os.remove(output_path)
             return None
             
         translation_time = time.time() - start_time
         logger.info(f"Translation completed in {translation_time:.2f} seconds")
         
-        # Save translated text to output file
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(translated_text)
-            
         logger.info(f"Translated text saved to {output_path}")
-        logger.info(f"Translation length: {len(translated_text)} characters")
+        logger.info(f"Translation length: {translated_length} characters")
         
         return output_path
         
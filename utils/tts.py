@@ -5,6 +5,11 @@ This module handles text-to-speech conversion using Bark, Coqui TTS, or Google T
 
 import os
 import time
+import logging
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from types import MappingProxyType
 import numpy as np
 import soundfile as sf
 from gtts import gTTS
@@ -14,94 +19,192 @@ from config.settings import (
     TARGET_LANGUAGE, 
     TTS_ENGINE
 )
+from utils._torch_compat import cuda_autocast, limit_cpu_threads
+from utils.io_utils import ensure_dir, write_wav
 from utils.logger import setup_logger
+from utils.text_splitter import normalize_for_tts, split_text
+from utils.video_merger import concat_wavs_ffmpeg
 
 logger = setup_logger(__name__)
 
-def generate_speech_bark(text, output_path, language=TARGET_LANGUAGE, voice_preset="v2/en_speaker_6"):
+# Engines that synthesize autoregressively and are fed one sentence chunk at a time
+_SENTENCE_ENGINES = ("bark", "coqui", "voice_clone")
+
+# Longest text passed to a single autoregressive TTS call
+_TTS_MAX_CHARS = 240
+
+# Concurrent Google TTS requests in text_to_speech_batch (network-bound)
+_GTTS_MAX_WORKERS = 8
+
+# Hugging Face checkpoint used for Bark
+_BARK_MODEL = "suno/bark"
+
+# Language-specific Bark speakers; other languages keep the requested preset
+_BARK_VOICE_PRESETS = MappingProxyType({
+    "tr": "v2/tr_speaker_0",  # Turkish speaker
+    "fr": "v2/fr_speaker_0",  # French speaker
+    "es": "v2/es_speaker_0",  # Spanish speaker
+    "de": "v2/de_speaker_0"   # German speaker
+})
+
+# Map language codes to YourTTS format
+_YOURTTS_LANG = MappingProxyType({
+    "en": "en",
+    "tr": "en",  # YourTTS doesn't support Turkish, falling back to English
+    "fr": "fr-fr",  # YourTTS uses fr-fr for French
+    "es": "en",  # YourTTS doesn't support Spanish, falling back to English
+    "de": "en",  # YourTTS doesn't support German, falling back to English
+    "ru": "en",  # YourTTS doesn't support Russian, falling back to English
+    "zh": "en",  # YourTTS doesn't support Chinese, falling back to English
+    "ja": "en",  # YourTTS doesn't support Japanese, falling back to English
+    "ko": "en",  # YourTTS doesn't support Korean, falling back to English
+    "ar": "en",  # YourTTS doesn't support Arabic, falling back to English
+    "pt": "pt-br"  # YourTTS uses pt-br for Brazilian Portuguese
+})
+
+# Map language codes to Google TTS format
+_GTTS_LANG = MappingProxyType({
+    "en": "en",
+    "tr": "tr",
+    "fr": "fr",
+    "es": "es",
+    "de": "de",
+    "ru": "ru",
+    "zh": "zh-CN",
+    "ja": "ja",
+    "ko": "ko",
+    "ar": "ar"
+})
+
+@lru_cache(maxsize=4)
+def _get_tts(model_name, gpu):
+    """
+    Load a Coqui TTS model once per (model name, gpu) and reuse it across calls.
+    Cached models keep their weights in (GPU) memory for the life of the process.
+    """
+    from TTS.api import TTS
+    return TTS(model_name, gpu=gpu)
+
+@lru_cache(maxsize=1)
+def _get_bark():
+    """
+    Load the Bark processor and model (transformers implementation) once per process,
+    explicitly placed on the GPU in fp16 when CUDA is available.
+    
+    Returns:
+        tuple: (processor, model, device)
+    """
+    import torch
+    from transformers import AutoProcessor, BarkModel
+    
+    if torch.cuda.is_available():
+        device, dtype = "cuda", torch.float16
+    else:
+        device, dtype = "cpu", torch.float32
+        logger.warning("CUDA is not available. Bark will run on the CPU and be very slow.")
+    
+    processor = AutoProcessor.from_pretrained(_BARK_MODEL)
+    model = BarkModel.from_pretrained(_BARK_MODEL, torch_dtype=dtype).to(device)
+    return processor, model, device
+
+def generate_speech_bark(text, output_path, language=TARGET_LANGUAGE, voice_preset="v2/en_speaker_6",
+                         return_array=False):
     """
     Generate speech from text using Bark TTS (high quality but resource intensive).
     
     Args:
         text (str): Text to convert to speech
-        output_path (str): Path to save the generated audio
+        output_path (str): Path to save the generated audio (unused if return_array is True)
         language (str): Language code
         voice_preset (str): Voice preset to use
+        return_array (bool): Return the samples in memory instead of writing a file
     
     Returns:
-        str: Path to the generated audio file, or None if generation failed
+        str or tuple: Path to the generated audio file, or (float32 samples, sample rate)
+                      if return_array is True; None if generation failed
     """
     try:
-        from bark import SAMPLE_RATE, generate_audio, preload_models
+        import torch
         
         # Adjust voice preset based on language
-        if language.startswith("tr"):
-            voice_preset = "v2/tr_speaker_0"  # Turkish speaker
-        elif language.startswith("fr"):
-            voice_preset = "v2/fr_speaker_0"  # French speaker
-        elif language.startswith("es"):
-            voice_preset = "v2/es_speaker_0"  # Spanish speaker
-        elif language.startswith("de"):
-            voice_preset = "v2/de_speaker_0"  # German speaker
+        voice_preset = _BARK_VOICE_PRESETS.get(language[:2].lower(), voice_preset)
         
         logger.info(f"Generating speech using Bark TTS (voice: {voice_preset})")
         
-        # Preload models (one-time operation)
-        preload_models()
+        # Load models (one-time operation per process)
+        processor, model, device = _get_bark()
         
-        # Generate audio
+        # Generate audio, with the inputs on the same device as the model
         start_time = time.time()
-        audio_array = generate_audio(text, history_prompt=voice_preset)
+        inputs = processor(text, voice_preset=voice_preset).to(device)
+        with torch.inference_mode():
+            audio_array = model.generate(**inputs).cpu().float().numpy().squeeze()
+        sample_rate = model.generation_config.sample_rate
+        
+        if return_array:
+            logger.info(f"Speech generated in {time.time() - start_time:.2f} seconds")
+            return audio_array, sample_rate
         
         # Save audio to disk
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        sf.write(output_path, audio_array, SAMPLE_RATE)
+        ensure_dir(os.path.dirname(output_path))
+        write_wav(output_path, audio_array, sample_rate)
         
         generation_time = time.time() - start_time
-        file_size = os.path.getsize(output_path) / (1024 * 1024)  # Convert to MB
         
         logger.info(f"Speech generated successfully to {output_path}")
-        logger.info(f"Generation time: {generation_time:.2f} seconds, Size: {file_size:.2f} MB")
+        if logger.isEnabledFor(logging.INFO):
+            file_size = os.path.getsize(output_path) / (1024 * 1024)  # Convert to MB
+            logger.info(f"Generation time: {generation_time:.2f} seconds, Size: {file_size:.2f} MB")
         
         return output_path
         
     except ImportError:
-        logger.error("Bark TTS not installed. Install using 'pip install git+https://github.com/suno-ai/bark.git'")
+        logger.error("Bark TTS requires transformers. Install using 'pip install transformers'")
         return None
     except Exception as e:
         logger.error(f"Error generating speech with Bark: {str(e)}")
         return None
 
-def generate_speech_coqui(text, output_path, language=TARGET_LANGUAGE):
+def generate_speech_coqui(text, output_path, language=TARGET_LANGUAGE, return_array=False):
     """
     Generate speech from text using Coqui TTS (good quality, moderate resource usage).
     
     Args:
         text (str): Text to convert to speech
-        output_path (str): Path to save the generated audio
+        output_path (str): Path to save the generated audio (unused if return_array is True)
         language (str): Language code
+        return_array (bool): Return the samples in memory instead of writing a file
     
     Returns:
-        str: Path to the generated audio file, or None if generation failed
+        str or tuple: Path to the generated audio file, or (float32 samples, sample rate)
+                      if return_array is True; None if generation failed
     """
     try:
-        from TTS.api import TTS
+        import torch
         
         logger.info("Generating speech using Coqui TTS")
         
-        # Initialize TTS with appropriate model for language
+        # Initialize TTS with appropriate model for language (cached after the first call)
         start_time = time.time()
-        tts = TTS("tts_models/multilingual/multi-dataset/your_tts", gpu=True)
+        tts = _get_tts("tts_models/multilingual/multi-dataset/your_tts", True)
         
-        # Generate speech
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        tts.tts_to_file(text=text, file_path=output_path)
+        with torch.inference_mode(), cuda_autocast():
+            wav = np.asarray(tts.tts(text=text), dtype=np.float32)
+        
+        if return_array:
+            logger.info(f"Speech generated in {time.time() - start_time:.2f} seconds")
+            return wav, tts.synthesizer.output_sample_rate
+        
+        # Write 16-bit PCM through libsndfile instead of tts_to_file's Python WAV writer
+        ensure_dir(os.path.dirname(output_path))
+        write_wav(output_path, wav, tts.synthesizer.output_sample_rate)
         
         generation_time = time.time() - start_time
-        file_size = os.path.getsize(output_path) / (1024 * 1024)  # Convert to MB
         
         logger.info(f"Speech generated successfully to {output_path}")
-        logger.info(f"Generation time: {generation_time:.2f} seconds, Size: {file_size:.2f} MB")
+        if logger.isEnabledFor(logging.INFO):
+            file_size = os.path.getsize(output_path) / (1024 * 1024)  # Convert to MB
+            logger.info(f"Generation time: {generation_time:.2f} seconds, Size: {file_size:.2f} MB")
         
         return output_path
         
@@ -126,7 +229,7 @@ def generate_speech_voice_clone(text, output_path, reference_audio_path, languag
         str: Path to the generated audio file, or None if generation failed
     """
     try:
-        from TTS.api import TTS
+        import torch
         
         logger.info(f"Generating speech using voice cloning with reference: {reference_audio_path}")
         
@@ -135,52 +238,39 @@ def generate_speech_voice_clone(text, output_path, reference_audio_path, languag
             logger.error(f"Reference audio file not found: {reference_audio_path}")
             return None
             
-        # Map language codes to YourTTS format
-        lang_mapping = {
-            "en": "en",
-            "tr": "en",  # YourTTS doesn't support Turkish, falling back to English
-            "fr": "fr-fr",  # YourTTS uses fr-fr for French
-            "es": "en",  # YourTTS doesn't support Spanish, falling back to English
-            "de": "en",  # YourTTS doesn't support German, falling back to English
-            "ru": "en",  # YourTTS doesn't support Russian, falling back to English
-            "zh": "en",  # YourTTS doesn't support Chinese, falling back to English
-            "ja": "en",  # YourTTS doesn't support Japanese, falling back to English
-            "ko": "en",  # YourTTS doesn't support Korean, falling back to English
-            "ar": "en",  # YourTTS doesn't support Arabic, falling back to English
-            "pt": "pt-br"  # YourTTS uses pt-br for Brazilian Portuguese
-        }
-        
-        # Get appropriate language code
-        if language in lang_mapping:
-            tts_lang = lang_mapping[language]
-        elif language[:2] in lang_mapping:
-            tts_lang = lang_mapping[language[:2]]
-        else:
+        # Get appropriate YourTTS language code
+        tts_lang = _YOURTTS_LANG.get(language[:2].lower())
+        if tts_lang is None:
             tts_lang = "en"  # Default to English if language not found
             logger.warning(f"Language {language} not found in mapping, defaulting to English")
         
         logger.info(f"Using language code '{tts_lang}' for YourTTS voice cloning")
         
-        # Initialize TTS with YourTTS model (optimized for voice cloning)
+        # Initialize TTS with YourTTS model (optimized for voice cloning, cached after the first call)
         start_time = time.time()
-        tts = TTS("tts_models/multilingual/multi-dataset/your_tts")
+        tts = _get_tts("tts_models/multilingual/multi-dataset/your_tts", False)
         
         # Generate speech with voice cloning
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        ensure_dir(os.path.dirname(output_path))
         logger.info(f"Starting voice cloning generation with language: {tts_lang}")
         
-        tts.tts_to_file(
-            text=text,
-            file_path=output_path,
-            speaker_wav=reference_audio_path,
-            language=tts_lang
-        )
+        # This model runs on the CPU, so keep PyTorch from oversubscribing the cores
+        with torch.inference_mode(), limit_cpu_threads():
+            wav = tts.tts(
+                text=text,
+                speaker_wav=reference_audio_path,
+                language=tts_lang
+            )
+        
+        # Write 16-bit PCM through libsndfile instead of tts_to_file's Python WAV writer
+        write_wav(output_path, np.asarray(wav, dtype=np.float32), tts.synthesizer.output_sample_rate)
         
         generation_time = time.time() - start_time
-        file_size = os.path.getsize(output_path) / (1024 * 1024)  # Convert to MB
         
         logger.info(f"Voice cloned speech generated successfully to {output_path}")
-        logger.info(f"Generation time: {generation_time:.2f} seconds, Size: {file_size:.2f} MB")
+        if logger.isEnabledFor(logging.INFO):
+            file_size = os.path.getsize(output_path) / (1024 * 1024)  # Convert to MB
+            logger.info(f"Generation time: {generation_time:.2f} seconds, Size: {file_size:.2f} MB")
         
         return output_path
         
@@ -206,26 +296,9 @@ def generate_speech_gtts(text, output_path, language=TARGET_LANGUAGE):
     try:
         logger.info(f"Generating speech using Google TTS (language: {language})")
         
-        # Map language codes to Google TTS format if needed
-        lang_mapping = {
-            "en": "en",
-            "tr": "tr",
-            "fr": "fr",
-            "es": "es",
-            "de": "de",
-            "ru": "ru",
-            "zh": "zh-CN",
-            "ja": "ja",
-            "ko": "ko",
-            "ar": "ar"
-        }
-        
-        # Get appropriate language code
-        if language in lang_mapping:
-            tts_lang = lang_mapping[language]
-        elif language[:2] in lang_mapping:
-            tts_lang = lang_mapping[language[:2]]
-        else:
+        # Get appropriate Google TTS language code
+        tts_lang = _GTTS_LANG.get(language[:2].lower())
+        if tts_lang is None:
             tts_lang = "en"  # Default to English if language not found
             logger.warning(f"Language {language} not found in mapping, defaulting to English")
         
@@ -234,14 +307,15 @@ def generate_speech_gtts(text, output_path, language=TARGET_LANGUAGE):
         tts = gTTS(text=text, lang=tts_lang, slow=False)
         
         # Save to file
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        ensure_dir(os.path.dirname(output_path))
         tts.save(output_path)
         
         generation_time = time.time() - start_time
-        file_size = os.path.getsize(output_path) / (1024 * 1024)  # Convert to MB
         
         logger.info(f"Speech generated successfully to {output_path}")
-        logger.info(f"Generation time: {generation_time:.2f} seconds, Size: {file_size:.2f} MB")
+        if logger.isEnabledFor(logging.INFO):
+            file_size = os.path.getsize(output_path) / (1024 * 1024)  # Convert to MB
+            logger.info(f"Generation time: {generation_time:.2f} seconds, Size: {file_size:.2f} MB")
         
         return output_path
         
@@ -249,6 +323,70 @@ def generate_speech_gtts(text, output_path, language=TARGET_LANGUAGE):
         logger.error(f"Error generating speech with Google TTS: {str(e)}")
         return None
 
+def _generate_speech(text, output_path, language, engine, reference_audio=None):
+    """Generate speech for a single text with the given engine, falling back to Google TTS."""
+    if engine == "bark":
+        return generate_speech_bark(text, output_path, language)
+    elif engine == "coqui":
+        return generate_speech_coqui(text, output_path, language)
+    elif engine == "gtts":
+        return generate_speech_gtts(text, output_path, language)
+    elif engine == "voice_clone":
+        if reference_audio and os.path.exists(reference_audio):
+            return generate_speech_voice_clone(text, output_path, reference_audio, language)
+        else:
+            logger.error(f"Voice cloning requires a valid reference audio file. Falling back to Google TTS.")
+            return generate_speech_gtts(text, output_path, language)
+    else:
+        logger.error(f"Unknown TTS engine: {engine}")
+        # Fall back to Google TTS if unknown engine
+        logger.info("Falling back to Google TTS")
+        return generate_speech_gtts(text, output_path, language)
+
+def generate_speech_batch(texts, output_paths, language=TARGET_LANGUAGE, engine=TTS_ENGINE,
+                          reference_audio=None):
+    """
+    Generate speech for several texts with one engine.
+    The engine's model is loaded on the first item and stays resident for the rest.
+    The items run one after another: the cached model is shared, and its forward pass
+    isn't safe to call from several threads at once. To keep a GPU busier, run separate
+    batches in separate processes; on dedicated inference hosts, the CUDA MPS daemon
+    (nvidia-cuda-mps-control -d) lets the kernels of those processes overlap.
+    
+    Args:
+        texts (list): Texts to convert to speech
+        output_paths (list): Path to save the audio of each text
+        language (str): Language code
+        engine (str): TTS engine to use ('bark', 'coqui', 'voice_clone', or 'gtts')
+        reference_audio (str): Path to reference audio for voice cloning (only used if engine='voice_clone')
+    
+    Returns:
+        list: Path to each generated audio file, or None where generation failed
+    """
+    engine = engine.lower()
+    return [_generate_speech(text, output_path, language, engine, reference_audio)
+            for text, output_path in zip(texts, output_paths)]
+
+def _concat_wavs(paths, output_path):
+    """
+    Concatenate WAV files that share a sample rate and channel count into one file
+    by decoding them with soundfile (used when ffmpeg is unavailable).
+    
+    Returns:
+        str: Path to the concatenated file
+    """
+    with sf.SoundFile(paths[0]) as first:
+        samplerate, channels = first.samplerate, first.channels
+    
+    with sf.SoundFile(output_path, "w", samplerate=samplerate, channels=channels,
+                      subtype="PCM_16") as out:
+        for path in paths:
+            with sf.SoundFile(path) as chunk:
+                out.write(chunk.read(dtype="float32"))
+    
+    logger.info(f"Concatenated {len(paths)} audio chunks into {output_path}")
+    return output_path
+
 def text_to_speech(input_path=TEMP_TRANSLATED_PATH, output_path=TEMP_DUBBED_AUDIO_PATH,
                  language=TARGET_LANGUAGE, engine=TTS_ENGINE, reference_audio=None):
     """
@@ -274,33 +412,66 @@ def text_to_speech(input_path=TEMP_TRANSLATED_PATH, output_path=TEMP_DUBBED_AUDI
     try:
         # Read input file
         with open(input_path, "r", encoding="utf-8") as f:
-            text = f.read()
+            text = normalize_for_tts(f.read())
         
         logger.info(f"Loaded text from {input_path} ({len(text)} characters)")
         
-        # Generate speech based on selected engine
-        if engine.lower() == "bark":
-            return generate_speech_bark(text, output_path, language)
-        elif engine.lower() == "coqui":
-            return generate_speech_coqui(text, output_path, language)
-        elif engine.lower() == "gtts":
-            return generate_speech_gtts(text, output_path, language)
-        elif engine.lower() == "voice_clone":
-            if reference_audio and os.path.exists(reference_audio):
-                return generate_speech_voice_clone(text, output_path, reference_audio, language)
-            else:
-                logger.error(f"Voice cloning requires a valid reference audio file. Falling back to Google TTS.")
-                return generate_speech_gtts(text, output_path, language)
-        else:
-            logger.error(f"Unknown TTS engine: {engine}")
-            # Fall back to Google TTS if unknown engine
-            logger.info("Falling back to Google TTS")
-            return generate_speech_gtts(text, output_path, language)
+        engine = engine.lower()
+        if engine == "voice_clone" and not (reference_audio and os.path.exists(reference_audio)):
+            logger.error(f"Voice cloning requires a valid reference audio file. Falling back to Google TTS.")
+            engine = "gtts"
+        
+        # gTTS splits long text itself; the autoregressive engines are fed one sentence at a time
+        sentences = split_text(text, max_chars=_TTS_MAX_CHARS)
+        if engine not in _SENTENCE_ENGINES or len(sentences) <= 1:
+            return _generate_speech(text, output_path, language, engine, reference_audio)
+        
+        logger.info(f"Generating speech for {len(sentences)} sentence chunks")
+        ensure_dir(os.path.dirname(output_path))
+        with tempfile.TemporaryDirectory(dir=os.path.dirname(output_path)) as chunk_dir:
+            chunk_paths = [os.path.join(chunk_dir, f"temp_chunk_{i}.wav") for i in range(len(sentences))]
+            results = generate_speech_batch(sentences, chunk_paths, language, engine, reference_audio)
+            
+            if any(result is None for result in results):
+                logger.error("Speech generation failed for at least one sentence chunk")
+                return None
+            
+            # All chunks come from one engine, so the concat demuxer can append them without decoding
+            return concat_wavs_ffmpeg(chunk_paths, output_path) or _concat_wavs(chunk_paths, output_path)
             
     except Exception as e:
         logger.error(f"Error during text-to-speech conversion: {str(e)}")
         return None
 
+def text_to_speech_batch(items, language=TARGET_LANGUAGE, engine=TTS_ENGINE, reference_audio=None):
+    """
+    Convert several text files to speech with one engine, e.g. a directory of subtitles.
+    Google TTS requests run concurrently; the local models are loaded once and stay
+    resident while the files are processed one after another.
+    
+    Args:
+        items (list): (input_path, output_path) pairs
+        language (str): Language code
+        engine (str): TTS engine to use ('bark', 'coqui', 'voice_clone', or 'gtts')
+        reference_audio (str): Path to reference audio for voice cloning (only used if engine='voice_clone')
+    
+    Returns:
+        list: Path to each generated audio file, or None where conversion failed
+    """
+    engine = engine.lower()
+    logger.info(f"Converting {len(items)} files to speech using {engine} engine")
+    
+    def convert(item):
+        input_path, output_path = item
+        return text_to_speech(input_path, output_path, language, engine, reference_audio)
+    
+    if engine == "gtts":
+        with ThreadPoolExecutor(max_workers=_GTTS_MAX_WORKERS) as executor:
+            return list(executor.map(convert, items))
+    
+    # The local models are shared and not thread-safe, so keep one resident and iterate
+    return [convert(item) for item in items]
+
 
 # Example usage
 if __name__ == "__main__":
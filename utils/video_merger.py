@@ -5,13 +5,98 @@ This module handles merging the original video with the newly generated dubbed a
 
 import os
 import time
+import logging
 import subprocess
-from moviepy.editor import VideoFileClip, AudioFileClip, CompositeAudioClip
+import tempfile
+from functools import lru_cache
 from config.settings import TEMP_VIDEO_PATH, TEMP_DUBBED_AUDIO_PATH, OUTPUT_VIDEO_PATH
+from utils.ffprobe import get_audio_codec, get_media_duration
+from utils.io_utils import ensure_dir
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Upper bound on a single ffmpeg run (seconds), and how much of its stderr ends up in the log
+_FFMPEG_TIMEOUT = 3600
+_STDERR_TAIL = 4096
+
+# Encoder threads for ffmpeg (AAC encoding and re-encodes parallelize across them)
+_FFMPEG_THREADS = str(os.cpu_count() or 4)
+
+# H.264 encoders in order of preference, with their arguments; libx264 is the CPU fallback
+_H264_ENCODERS = (
+    ("h264_nvenc", ["-c:v", "h264_nvenc", "-preset", "p5", "-tune", "hq", "-b:v", "5M"]),
+    ("h264_qsv", ["-c:v", "h264_qsv", "-b:v", "5M"]),
+    ("h264_videotoolbox", ["-c:v", "h264_videotoolbox", "-b:v", "5M"]),
+    ("libx264", ["-c:v", "libx264", "-preset", "veryfast", "-crf", "20"])
+)
+
+@lru_cache(maxsize=1)
+def _select_hw_encoder():
+    """
+    Pick the first H.264 encoder this ffmpeg build provides, preferring hardware encoders.
+    Probed once per process.
+    
+    Returns:
+        list: ffmpeg video codec arguments, or None if no H.264 encoder is available
+    """
+    try:
+        result = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-encoders"],
+            capture_output=True,
+            check=False
+        )
+    except FileNotFoundError:
+        return None
+    
+    available = {
+        line.split()[1] for line in result.stdout.decode(errors="replace").splitlines()
+        if len(line.split()) > 1
+    }
+    for name, args in _H264_ENCODERS:
+        if name in available:
+            logger.info(f"Using {name} for video re-encoding")
+            return args
+    return None
+
+def _run_merge(video_path, audio_path, output_path, video_args, audio_args, length_args):
+    """Run the ffmpeg merge with the given codec arguments and return the completed process."""
+    # Prepare ffmpeg command
+    # -y: Overwrite output without asking
+    # -i: Input files
+    # -map: Choose streams from input files
+    # -t: Output duration (the video's duration)
+    # -movflags +faststart: Put the index at the start of the file for progressive playback
+    cmd = [
+        "ffmpeg",
+        "-y",
+        "-hide_banner",
+        "-loglevel", "error",  # Only errors on stderr
+        "-nostats",            # No progress lines
+        "-threads", _FFMPEG_THREADS,
+        "-i", video_path,
+        "-i", audio_path,
+        "-map", "0:v:0",  # First video stream from first input
+        "-map", "1:a:0",  # First audio stream from second input
+        *video_args,      # Copy the video stream, or re-encode it on retry
+        *audio_args,      # Copy AAC audio, otherwise encode to AAC
+        *length_args,     # End at the video's duration
+        "-movflags", "+faststart",
+        output_path
+    ]
+    
+    logger.debug(f"Running command: {' '.join(cmd)}")
+    
+    # Run the process; stdout is unused and stderr only carries errors,
+    # so nothing accumulates in memory while ffmpeg runs
+    return subprocess.run(
+        cmd,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        check=False,
+        timeout=_FFMPEG_TIMEOUT
+    )
+
 def merge_video_audio_ffmpeg(video_path=TEMP_VIDEO_PATH, audio_path=TEMP_DUBBED_AUDIO_PATH, 
                           output_path=OUTPUT_VIDEO_PATH):
     """
@@ -37,66 +122,248 @@ def merge_video_audio_ffmpeg(video_path=TEMP_VIDEO_PATH, audio_path=TEMP_DUBBED_
     
     try:
         # Create output directory if it doesn't exist
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        
-        # Prepare ffmpeg command
-        # -y: Overwrite output without asking
-        # -i: Input files
-        # -map: Choose streams from input files
-        # -c:v copy: Copy video stream without re-encoding
-        # -shortest: End when the shortest input stream ends
+        ensure_dir(os.path.dirname(output_path))
+        
+        # Only re-encode the dubbed audio when it isn't already AAC
+        audio_codec = get_audio_codec(audio_path)
+        if audio_codec == "aac":
+            audio_args = ["-c:a", "copy"]
+        else:
+            audio_args = ["-c:a", "aac", "-b:a", "192k"]
+        
+        # Cut the output at the video's length from the container header; this replaces
+        # -shortest, which keeps both inputs buffered until the shorter one ends
+        video_duration = get_media_duration(video_path)
+        if video_duration:
+            length_args = ["-t", f"{video_duration:.3f}"]
+        else:
+            length_args = ["-shortest"]
+        
+        # Execute ffmpeg command, copying the video stream without re-encoding
+        start_time = time.time()
+        result = _run_merge(video_path, audio_path, output_path, ["-c:v", "copy"], audio_args, length_args)
+        
+        # The video stream can't always be copied into the output (e.g. an unusual codec);
+        # retry with a re-encode, on the GPU when a hardware encoder is available
+        if result.returncode != 0:
+            encoder_args = _select_hw_encoder()
+            if encoder_args:
+                logger.warning(f"Copying the video stream failed, re-encoding: {result.stderr[-_STDERR_TAIL:].decode(errors='replace')}")
+                result = _run_merge(video_path, audio_path, output_path, encoder_args, audio_args, length_args)
+        
+        # Check if process was successful
+        if result.returncode != 0:
+            logger.error(f"Error merging video and audio: {result.stderr[-_STDERR_TAIL:].decode(errors='replace')}")
+            return None
+            
+        merge_time = time.time() - start_time
+        
+        logger.info(f"Video and audio merged successfully to {output_path}")
+        if logger.isEnabledFor(logging.INFO):
+            file_size = os.path.getsize(output_path) / (1024 * 1024)  # Convert to MB
+            logger.info(f"Merge time: {merge_time:.2f} seconds, Size: {file_size:.2f} MB")
+        
+        return output_path
+    
+    except FileNotFoundError:
+        logger.error("ffmpeg not found. Please install ffmpeg and ensure it's in your PATH.")
+        return None
+    except subprocess.TimeoutExpired:
+        logger.error(f"ffmpeg did not finish within {_FFMPEG_TIMEOUT} seconds")
+        return None
+    except Exception as e:
+        logger.error(f"Unexpected error during video/audio merging: {str(e)}")
+        return None
+
+def _write_pcm16(stream, audio):
+    """
+    Write mono samples to a binary stream as signed 16-bit little-endian PCM.
+    Pipes can't seek, so the bytes are written directly rather than through an audio file writer.
+    
+    Args:
+        stream: Writable binary stream, e.g. a subprocess's stdin
+        audio (numpy.ndarray): Mono samples (float in [-1, 1] or int16)
+    """
+    import numpy as np
+    
+    audio = np.asarray(audio)
+    if audio.dtype.kind == "f":
+        audio = np.clip(audio, -1, 1) * 32767
+    stream.write(audio.astype("<i2").tobytes())
+
+def merge_video_audio_pipe(video_path, audio, sample_rate, output_path=OUTPUT_VIDEO_PATH):
+    """
+    Merge a video with in-memory audio samples using ffmpeg, streaming the samples
+    to ffmpeg's stdin as raw PCM instead of writing and re-reading a WAV file.
+    
+    Args:
+        video_path (str): Path to the input video file
+        audio (numpy.ndarray): Mono audio samples (float32 in [-1, 1] or int16)
+        sample_rate (int): Sample rate of the audio samples
+        output_path (str): Path to save the merged video
+    
+    Returns:
+        str: Path to the merged video file, or None if merging failed
+    """
+    logger.info(f"Merging video and in-memory audio using ffmpeg: {video_path}")
+    
+    if not os.path.exists(video_path):
+        logger.error(f"Video file not found: {video_path}")
+        return None
+    
+    try:
+        ensure_dir(os.path.dirname(output_path))
+        
+        video_duration = get_media_duration(video_path)
+        if video_duration:
+            length_args = ["-t", f"{video_duration:.3f}"]
+        else:
+            length_args = ["-shortest"]
+        
+        # The second input is signed 16-bit little-endian mono PCM read from stdin
         cmd = [
             "ffmpeg",
             "-y",
+            "-hide_banner",
+            "-loglevel", "error",
+            "-nostats",
+            "-threads", _FFMPEG_THREADS,
             "-i", video_path,
-            "-i", audio_path,
-            "-map", "0:v:0",  # First video stream from first input
-            "-map", "1:a:0",  # First audio stream from second input
-            "-c:v", "copy",   # Copy video codec
-            "-c:a", "aac",    # Use AAC for audio
-            "-b:a", "192k",   # Audio bitrate
-            "-shortest",      # End when shortest input ends
+            "-f", "s16le",
+            "-ar", str(sample_rate),
+            "-ac", "1",
+            "-i", "pipe:0",
+            "-map", "0:v:0",
+            "-map", "1:a:0",
+            "-c:v", "copy",
+            "-c:a", "aac", "-b:a", "192k",
+            *length_args,
+            "-movflags", "+faststart",
             output_path
         ]
         
-        # Execute ffmpeg command
         start_time = time.time()
         logger.debug(f"Running command: {' '.join(cmd)}")
         
-        # Run the process
-        process = subprocess.Popen(
-            cmd, 
-            stdout=subprocess.PIPE, 
-            stderr=subprocess.PIPE
-        )
-        
-        # Wait for process to complete
-        stdout, stderr = process.communicate()
-        
-        # Check if process was successful
-        if process.returncode != 0:
-            logger.error(f"Error merging video and audio: {stderr.decode()}")
-            return None
+        # stderr goes to a temporary file so a chatty ffmpeg can't block on a full pipe
+        # while we are still writing samples to stdin
+        with tempfile.TemporaryFile() as stderr_file:
+            process = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=stderr_file
+            )
+            try:
+                _write_pcm16(process.stdin, audio)
+            except BrokenPipeError:
+                # ffmpeg exited early; its error output is reported below
+                pass
+            finally:
+                process.stdin.close()
+            try:
+                returncode = process.wait(timeout=_FFMPEG_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+                raise
             
+            if returncode != 0:
+                # Only the tail of stderr, where ffmpeg reports the failure
+                stderr_file.seek(0, os.SEEK_END)
+                stderr_file.seek(max(0, stderr_file.tell() - _STDERR_TAIL))
+                logger.error(f"Error merging video and audio: {stderr_file.read().decode(errors='replace')}")
+                return None
+        
         merge_time = time.time() - start_time
-        file_size = os.path.getsize(output_path) / (1024 * 1024)  # Convert to MB
         
         logger.info(f"Video and audio merged successfully to {output_path}")
-        logger.info(f"Merge time: {merge_time:.2f} seconds, Size: {file_size:.2f} MB")
+        if logger.isEnabledFor(logging.INFO):
+            file_size = os.path.getsize(output_path) / (1024 * 1024)  # Convert to MB
+            logger.info(f"Merge time: {merge_time:.2f} seconds, Size: {file_size:.2f} MB")
         
         return output_path
     
     except FileNotFoundError:
         logger.error("ffmpeg not found. Please install ffmpeg and ensure it's in your PATH.")
         return None
+    except subprocess.TimeoutExpired:
+        logger.error(f"ffmpeg did not finish within {_FFMPEG_TIMEOUT} seconds")
+        return None
     except Exception as e:
         logger.error(f"Unexpected error during video/audio merging: {str(e)}")
         return None
 
+def concat_wavs_ffmpeg(paths, out_path):
+    """
+    Concatenate audio files with ffmpeg's concat demuxer, which appends the streams
+    without decoding them. All inputs must share codec, sample rate and channel count.
+    
+    Args:
+        paths (list): Paths of the audio files, in order
+        out_path (str): Path to save the concatenated audio
+    
+    Returns:
+        str: Path to the concatenated file, or None if concatenation failed
+    """
+    list_path = None
+    try:
+        ensure_dir(os.path.dirname(out_path))
+        
+        # The concat demuxer reads its inputs from a list file; quotes in paths are escaped
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", encoding="utf-8", delete=False) as list_file:
+            list_path = list_file.name
+            for path in paths:
+                escaped = os.path.abspath(path).replace("'", "'\\''")
+                list_file.write(f"file '{escaped}'\n")
+        
+        cmd = [
+            "ffmpeg",
+            "-y",
+            "-hide_banner",
+            "-loglevel", "error",
+            "-nostats",
+            "-f", "concat",
+            "-safe", "0",  # Allow absolute paths in the list file
+            "-i", list_path,
+            "-c", "copy",
+            out_path
+        ]
+        
+        logger.debug(f"Running command: {' '.join(cmd)}")
+        result = subprocess.run(
+            cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            check=False,
+            timeout=_FFMPEG_TIMEOUT
+        )
+        
+        if result.returncode != 0:
+            logger.error(f"Error concatenating audio files: {result.stderr[-_STDERR_TAIL:].decode(errors='replace')}")
+            return None
+        
+        logger.info(f"Concatenated {len(paths)} audio files into {out_path}")
+        return out_path
+    
+    except FileNotFoundError:
+        logger.error("ffmpeg not found. Please install ffmpeg and ensure it's in your PATH.")
+        return None
+    except subprocess.TimeoutExpired:
+        logger.error(f"ffmpeg did not finish within {_FFMPEG_TIMEOUT} seconds")
+        return None
+    except Exception as e:
+        logger.error(f"Unexpected error during audio concatenation: {str(e)}")
+        return None
+    finally:
+        if list_path and os.path.exists(list_path):
+            os.remove(list_path)
+
 def merge_video_audio_moviepy(video_path=TEMP_VIDEO_PATH, audio_path=TEMP_DUBBED_AUDIO_PATH, 
                            output_path=OUTPUT_VIDEO_PATH):
     """
-    Merge video and audio using moviepy (more flexible but slower).
+    Merge video and audio using moviepy (more flexible but much slower, since the
+    whole video is re-encoded). Only used when explicitly requested.
     
     Args:
         video_path (str): Path to the input video file
@@ -117,8 +384,11 @@ def merge_video_audio_moviepy(video_path=TEMP_VIDEO_PATH, audio_path=TEMP_DUBBED
         return None
     
     try:
+        # moviepy (and the imageio/ffmpeg stack behind it) is only imported when used
+        from moviepy.editor import VideoFileClip, AudioFileClip
+        
         # Create output directory if it doesn't exist
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        ensure_dir(os.path.dirname(output_path))
         
         # Load the video and audio clips
         start_time = time.time()
@@ -149,10 +419,11 @@ def merge_video_audio_moviepy(video_path=TEMP_VIDEO_PATH, audio_path=TEMP_DUBBED
         video_with_dubbed_audio.close()
         
         merge_time = time.time() - start_time
-        file_size = os.path.getsize(output_path) / (1024 * 1024)  # Convert to MB
         
         logger.info(f"Video and audio merged successfully to {output_path}")
-        logger.info(f"Merge time: {merge_time:.2f} seconds, Size: {file_size:.2f} MB")
+        if logger.isEnabledFor(logging.INFO):
+            file_size = os.path.getsize(output_path) / (1024 * 1024)  # Convert to MB
+            logger.info(f"Merge time: {merge_time:.2f} seconds, Size: {file_size:.2f} MB")
         
         return output_path
         
@@ -169,21 +440,16 @@ def merge_video_audio(video_path=TEMP_VIDEO_PATH, audio_path=TEMP_DUBBED_AUDIO_P
         video_path (str): Path to the input video file
         audio_path (str): Path to the input audio file
         output_path (str): Path to save the merged video
-        use_ffmpeg (bool): Whether to use ffmpeg (True) or moviepy (False)
+        use_ffmpeg (bool): Whether to use ffmpeg (True) or the slower, re-encoding moviepy path (False)
     
     Returns:
         str: Path to the merged video file, or None if merging failed
     """
     if use_ffmpeg:
-        try:
-            # Try ffmpeg first (faster)
-            return merge_video_audio_ffmpeg(video_path, audio_path, output_path)
-        except Exception as e:
-            logger.warning(f"ffmpeg merging failed: {str(e)}. Falling back to moviepy.")
-            # Fall back to moviepy if ffmpeg fails
-            return merge_video_audio_moviepy(video_path, audio_path, output_path)
+        # ffmpeg stream-copies the video (fast)
+        return merge_video_audio_ffmpeg(video_path, audio_path, output_path)
     else:
-        # Use moviepy directly
+        # Use moviepy only when explicitly requested, since it re-encodes the video
         return merge_video_audio_moviepy(video_path, audio_path, output_path)
 
 
@@ -8,19 +8,87 @@ import os
 import time
 import torch
 import logging
-from TTS.tts.configs.xtts_config import XttsConfig
+import numpy as np
+from contextlib import nullcontext
+from functools import lru_cache
+from utils._torch_compat import register_tts_safe_globals, cuda_autocast, limit_cpu_threads
+from utils._xtts import (XTTS_MODEL_NAME, XTTS_MAX_CHARS, compile_xtts, get_speaker_latents, get_tts,
+                         xtts_language)
+from utils.io_utils import ensure_dir, write_wav
+from utils.text_splitter import normalize_for_tts, split_text
+from config.settings import XTTS_COMPILE, XTTS_INT8
 
-# Register the XTTS config as a safe global for PyTorch 2.6+
-try:
-    torch.serialization.add_safe_globals([XttsConfig])
-except AttributeError:
-    # PyTorch version doesn't have add_safe_globals (version < 2.6)
-    pass
+# Register the XTTS config classes as safe globals for PyTorch 2.6+
+register_tts_safe_globals()
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Below this much free GPU memory before loading XTTS, XTTS_INT8 quantizes the GPT decoder (bytes)
+_INT8_FREE_MEMORY_THRESHOLD = 6e9
+
+def _quantize_int8(module):
+    """
+    Replace the linear layers of a module in place with bitsandbytes int8 layers.
+    Covers nn.Linear and the transposed Conv1D projections used by Hugging Face GPT-2.
+    
+    Returns:
+        int: Number of layers replaced
+    """
+    import bitsandbytes as bnb
+    
+    replaced = 0
+    for name, child in list(module.named_children()):
+        if isinstance(child, torch.nn.Linear):
+            in_features, out_features = child.in_features, child.out_features
+            weight = child.weight.data
+        elif type(child).__name__ == "Conv1D" and hasattr(child, "nf"):
+            # Conv1D stores its weight as (in_features, out_features)
+            in_features, out_features = child.weight.shape
+            weight = child.weight.data.t()
+        else:
+            replaced += _quantize_int8(child)
+            continue
+        
+        device = child.weight.device
+        layer = bnb.nn.Linear8bitLt(in_features, out_features, bias=child.bias is not None,
+                                    has_fp16_weights=False)
+        layer.weight = bnb.nn.Int8Params(weight.contiguous().cpu(), requires_grad=False,
+                                         has_fp16_weights=False)
+        if child.bias is not None:
+            layer.bias = torch.nn.Parameter(child.bias.data.cpu(), requires_grad=False)
+        # Int8Params quantizes the weights when moved to the GPU
+        setattr(module, name, layer.to(device))
+        replaced += 1
+    
+    return replaced
+
+@lru_cache(maxsize=2)
+def _get_xtts(gpu, compile_model=XTTS_COMPILE, quantize_int8=XTTS_INT8):
+    """
+    Load the XTTS v2 model once per process, optionally quantizing its GPT decoder to int8
+    on low-memory GPUs and compiling the decoder and HiFi-GAN vocoder.
+    Compilation happens lazily on the first inference call.
+    """
+    # Measure before loading: once XTTS is on the GPU, its own weights count against free memory
+    low_memory = quantize_int8 and gpu and torch.cuda.mem_get_info()[0] < _INT8_FREE_MEMORY_THRESHOLD
+    tts = get_tts(XTTS_MODEL_NAME, "cuda" if gpu else "cpu")
+    
+    # The vocoder is sensitive to quantization and stays in floating point
+    if low_memory and not getattr(tts, "_quantized", False):
+        try:
+            replaced = _quantize_int8(tts.synthesizer.tts_model.gpt)
+            tts._quantized = True
+            logger.info(f"Quantized {replaced} XTTS decoder layers to int8")
+        except ImportError:
+            logger.warning("bitsandbytes not installed, running XTTS without int8 quantization")
+    
+    if compile_model:
+        compile_xtts(tts)
+    
+    return tts
+
 def clone_voice_and_speak(text, speaker_wav_path, target_lang="en", output_path=None):
     """
     Clone a voice from an audio sample and generate speech in the target language.
@@ -46,37 +114,22 @@ def clone_voice_and_speak(text, speaker_wav_path, target_lang="en", output_path=
         logger.error(f"Speaker audio sample not found: {speaker_wav_path}")
         return None
     
+    sentences = split_text(normalize_for_tts(text), max_chars=XTTS_MAX_CHARS)
+    if not sentences:
+        logger.error("No text to synthesize")
+        return None
+    
     # Generate output path if not provided
     if not output_path:
         output_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "outputs")
-        os.makedirs(output_dir, exist_ok=True)
+        ensure_dir(output_dir)
         output_path = os.path.join(output_dir, f"xtts_cloned_{int(time.time())}.wav")
     
     # Ensure output directory exists
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    
-    # Map language codes to XTTS format
-    lang_mapping = {
-        "en": "en",
-        "fr": "fr",
-        "tr": "tr",
-        "es": "es",
-        "it": "it",
-        "de": "de",
-        "pt": "pt",
-        "pl": "pl",
-        "ru": "ru",
-        "nl": "nl",
-        "cs": "cs",
-        "ar": "ar",
-        "zh": "zh-cn",
-        "ja": "ja",
-        "ko": "ko",
-        "hu": "hu"
-    }
+    ensure_dir(os.path.dirname(output_path))
     
     # Get the XTTS language code
-    xtts_lang = lang_mapping.get(target_lang.lower(), "en")
+    xtts_lang = xtts_language(target_lang)
     logger.info(f"Using language code '{xtts_lang}' for XTTS")
     
     # Check if GPU is available
@@ -84,30 +137,38 @@ def clone_voice_and_speak(text, speaker_wav_path, target_lang="en", output_path=
     logger.info(f"GPU acceleration: {'Enabled' if use_gpu else 'Disabled'}")
     
     try:
-        from TTS.api import TTS
-        
         # Initialize TTS with XTTS v2 model - use the higher-level API which handles PyTorch compatibility
-        model_name = "tts_models/multilingual/multi-dataset/xtts_v2"
-        tts = TTS(model_name=model_name, gpu=use_gpu)
+        # The model is loaded on the first call and reused afterwards
+        tts = _get_xtts(use_gpu)
         
-        logger.info(f"Model loaded: {model_name}")
+        logger.info(f"Model loaded: {XTTS_MODEL_NAME}")
+        
+        # Encode the reference voice once, then synthesize sentence by sentence with the
+        # cached latents instead of letting tts_to_file re-run the speaker encoder
+        xtts_model = tts.synthesizer.tts_model
+        gpt_cond_latent, speaker_embedding = get_speaker_latents(
+            xtts_model, speaker_wav_path, XTTS_MODEL_NAME, "cuda" if use_gpu else "cpu")
         
         # Generate speech with voice cloning
         logger.info("Generating speech with cloned voice...")
-        tts.tts_to_file(
-            text=text,
-            file_path=output_path,
-            speaker_wav=speaker_wav_path,
-            language=xtts_lang
-        )
+        # Run without autograd bookkeeping, which dominates the CPU cost of the many small
+        # per-step decoder ops; on GPU also under fp16 autocast, on CPU with a single thread
+        wavs = []
+        with torch.inference_mode(), cuda_autocast(), (nullcontext() if use_gpu else limit_cpu_threads()):
+            for sentence in sentences:
+                out = xtts_model.inference(sentence, xtts_lang, gpt_cond_latent, speaker_embedding)
+                wavs.append(np.asarray(out["wav"], dtype=np.float32))
+        
+        write_wav(output_path, np.concatenate(wavs), xtts_model.config.audio.output_sample_rate)
         
         # Log performance metrics
         end_time = time.time()
         generation_time = end_time - start_time
-        file_size_mb = os.path.getsize(output_path) / (1024 * 1024)
         
         logger.info(f"Voice cloning completed in {generation_time:.2f} seconds")
-        logger.info(f"Generated audio saved to: {output_path} ({file_size_mb:.2f} MB)")
+        if logger.isEnabledFor(logging.INFO):
+            file_size_mb = os.path.getsize(output_path) / (1024 * 1024)
+            logger.info(f"Generated audio saved to: {output_path} ({file_size_mb:.2f} MB)")
         
         return output_path
         
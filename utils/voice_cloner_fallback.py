@@ -4,90 +4,548 @@ This module provides alternatives when the XTTS model can't be loaded
 due to compatibility issues.
 """
 
+import re
+import io
 import os
+import base64
 import time
+import asyncio
+import hashlib
 import logging
-import torch
+import tempfile
+import threading
+import wave
+import urllib.request
+from contextlib import suppress
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from types import MappingProxyType
+import requests
+from requests.adapters import HTTPAdapter
 from gtts import gTTS
-import numpy as np
+from utils._torch_compat import cuda_autocast, limit_process_cpu_threads
+from utils._xtts import (XTTS_MODEL_NAME, XTTS_MAX_CHARS, compile_xtts, get_speaker_latents, get_tts,
+                         xtts_language)
+from utils.io_utils import ensure_dir, write_wav
+from utils.text_splitter import normalize_for_tts, split_text
+from config.settings import OUTPUTS_DIR, XTTS_COMPILE, PIPER_VOICES_DIR
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Concurrent gTTS requests in clone_voice_fallback_many, and connections kept open to
+# Google's TTS endpoint so that many workers never wait for a pooled connection
+_GTTS_MAX_WORKERS = 10
+
+# Base64 MP3 payload in the responses of Google's TTS endpoint (as parsed by gTTS.stream)
+_GTTS_AUDIO_RE = re.compile(r'jQ1olc","\[\\"(.*)\\"]')
+
+@lru_cache(maxsize=1)
+def _get_gtts_session():
+    """
+    Create the keep-alive session for gTTS requests on first use, so repeated requests
+    reuse pooled TCP + TLS connections instead of gTTS opening a new session per request.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=_GTTS_MAX_WORKERS)
+    session.mount("https://", adapter)
+    return session
+
+def _parse_gtts_audio(response_text):
+    """
+    Decode the MP3 bytes from the body of a response from Google's TTS endpoint.
+    
+    Returns:
+        bytes: The MP3 audio, or None if the body holds no audio payload
+    """
+    chunks = _GTTS_AUDIO_RE.findall(response_text)
+    if not chunks:
+        return None
+    return b"".join(base64.b64decode(chunk) for chunk in chunks)
+
+def _fetch_gtts_public(tts):
+    """Synthesize with gTTS's own public transport (one new connection per request)."""
+    mp3_buffer = io.BytesIO()
+    tts.write_to_fp(mp3_buffer)
+    return mp3_buffer.getvalue()
+
+def _fetch_gtts(text, gtts_lang):
+    """
+    Synthesize a text with gTTS and return the MP3 bytes.
+    gTTS builds and signs the requests; they are sent through the pooled session and the
+    responses decoded the same way gTTS.stream() does. This relies on gTTS internals
+    (pinned in requirements.txt), so any mismatch falls back to gTTS's public write_to_fp.
+    """
+    tts = gTTS(text=text, lang=gtts_lang, slow=False)
+    if not hasattr(tts, "_prepare_requests"):
+        return _fetch_gtts_public(tts)
+    
+    session = _get_gtts_session()
+    proxies = urllib.request.getproxies()
+    audio = bytearray()
+    for prepared in tts._prepare_requests():
+        response = session.send(prepared, proxies=proxies, timeout=getattr(tts, "timeout", None))
+        response.raise_for_status()
+        
+        chunk_audio = _parse_gtts_audio(response.text)
+        if chunk_audio is None:
+            # The response format changed; gTTS's own parser reports real errors
+            logger.warning("Unrecognized gTTS response, retrying with gTTS's own transport")
+            return _fetch_gtts_public(tts)
+        audio += chunk_audio
+    return bytes(audio)
+
+# Map language codes to gTTS format
+_GTTS_LANG_MAP = MappingProxyType({
+    "en": "en",
+    "fr": "fr",
+    "tr": "tr",
+    "es": "es",
+    "it": "it",
+    "de": "de",
+    "pt": "pt",
+    "pl": "pl",
+    "ru": "ru",
+    "nl": "nl",
+    "cs": "cs",
+    "ar": "ar",
+    "zh": "zh-CN",
+    "ja": "ja",
+    "ko": "ko",
+    "hu": "hu"
+})
+
+# Synthesized gTTS audio, one MP3 per (language, text). Reads refresh an entry's mtime,
+# and once per process the least recently used entries are deleted down to the size cap
+_CACHE_DIR = os.path.join(OUTPUTS_DIR, "cache")
+_DISK_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+def _cache_path(text, gtts_lang):
+    """Get the path of the cached gTTS audio for a text in a language."""
+    digest = hashlib.blake2b(f"{gtts_lang}|{text}".encode("utf-8"), digest_size=16).hexdigest()
+    return os.path.join(_CACHE_DIR, f"{digest}.mp3")
+
+@lru_cache(maxsize=1)
+def _prune_disk_cache():
+    """
+    Delete the least recently used MP3s from the disk cache until it fits in
+    _DISK_CACHE_MAX_BYTES. Cached, so the directory is scanned once per process.
+    """
+    try:
+        with os.scandir(_CACHE_DIR) as scan:
+            entries = [(entry.stat().st_mtime, entry.stat().st_size, entry.path)
+                       for entry in scan if entry.name.endswith(".mp3") and entry.is_file()]
+    except FileNotFoundError:
+        return
+    
+    total_size = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total_size <= _DISK_CACHE_MAX_BYTES:
+            break
+        # Another process may have pruned (or be reading) the same entry
+        with suppress(OSError):
+            os.remove(path)
+        total_size -= size
+    logger.debug("gTTS disk cache is %d bytes", total_size)
+
+# Texts up to this length also stay in an in-memory LRU of _MEMORY_CACHE_SIZE entries.
+# 300 characters is roughly 20 seconds of MP3 (~80 KB), so the LRU stays around 20 MB;
+# longer texts are only cached on disk
+_MEMORY_CACHE_MAX_CHARS = 300
+_MEMORY_CACHE_SIZE = 256
+
+def _load_or_synthesize(text, gtts_lang):
+    """
+    Get the MP3 audio for a text in a language from the on-disk cache, else from gTTS.
+    gTTS output is deterministic per version, so cached bytes are always valid.
+    """
+    # Reuse audio synthesized earlier for the same text and language
+    cache_path = _cache_path(text, gtts_lang)
+    if os.path.exists(cache_path):
+        logger.info("Using cached speech: %s", cache_path)
+        with open(cache_path, "rb") as f:
+            audio = f.read()
+        # Mark the entry as recently used for _prune_disk_cache
+        with suppress(OSError):
+            os.utime(cache_path)
+        return audio
+    
+    logger.info("Generating speech with gTTS...")
+    audio = _fetch_gtts(text, gtts_lang)
+    
+    # Store in the disk cache; the rename makes the entry appear only once it's complete,
+    # even with concurrent writers
+    ensure_dir(_CACHE_DIR)
+    _prune_disk_cache()
+    tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(audio)
+    os.replace(tmp_path, cache_path)
+    return audio
+
+@lru_cache(maxsize=_MEMORY_CACHE_SIZE)
+def _load_or_synthesize_short(text, gtts_lang):
+    """_load_or_synthesize() behind an in-memory LRU, for texts up to _MEMORY_CACHE_MAX_CHARS."""
+    return _load_or_synthesize(text, gtts_lang)
+
+def _synthesize_bytes(text, gtts_lang):
+    """
+    Get the MP3 audio for a text in a language: from memory for recent short texts,
+    else from the on-disk cache, else from gTTS.
+    """
+    if len(text) <= _MEMORY_CACHE_MAX_CHARS:
+        return _load_or_synthesize_short(text, gtts_lang)
+    return _load_or_synthesize(text, gtts_lang)
+
+def _gtts_to_file(text, gtts_lang, output_path):
+    """Synthesize speech with gTTS into output_path, reusing the memory and disk caches."""
+    with open(output_path, "wb") as f:
+        f.write(_synthesize_bytes(text, gtts_lang))
+    return output_path
+
+@lru_cache(maxsize=8)
+def _get_piper_voice(lang):
+    """
+    Load the offline Piper voice for a language once per process.
+    Returns None if piper isn't installed or no voice model exists for the language.
+    """
+    model_path = os.path.join(PIPER_VOICES_DIR, f"{lang}.onnx")
+    if not os.path.exists(model_path):
+        return None
+    
+    try:
+        from piper.voice import PiperVoice
+    except ImportError:
+        logger.warning("Piper voice found at %s but piper-tts is not installed", model_path)
+        return None
+    
+    logger.info("Loading Piper voice: %s", model_path)
+    return PiperVoice.load(model_path)
+
+def _offline_tts(text, lang, output_path):
+    """
+    Synthesize speech locally with Piper, avoiding the network round trip.
+    Piper writes WAV, so the audio goes to output_path with a .wav extension
+    (e.g. speech.mp3 becomes speech.wav).
+    
+    Returns:
+        str: Path to the generated WAV file, or None if no offline voice is available
+             or synthesis failed
+    """
+    voice = _get_piper_voice(lang)
+    if voice is None:
+        return None
+    
+    wav_path = os.path.splitext(output_path)[0] + ".wav"
+    logger.info("Generating speech with offline Piper voice (%s)...", lang)
+    wav_file = None
+    try:
+        wav_file = wave.open(wav_path, "wb")
+        if hasattr(voice, "synthesize_wav"):
+            # piper-tts >= 1.3
+            voice.synthesize_wav(text, wav_file)
+        else:
+            voice.synthesize(text, wav_file)
+        wav_file.close()
+    except Exception as e:
+        logger.warning("Offline Piper synthesis failed: %s", e)
+        if wav_file is not None:
+            # Release the file handle; closing a header-less file raises its own error,
+            # which would hide the one logged above
+            with suppress(Exception):
+                wav_file.close()
+        with suppress(OSError):
+            os.remove(wav_path)
+        return None
+    return wav_path
+
+@lru_cache(maxsize=1)
+def _get_device():
+    """Pick the inference device once per process: "cuda" if available, otherwise "cpu"."""
+    import torch
+    
+    if torch.cuda.is_available():
+        logger.info("GPU is available, using CUDA")
+        return "cuda"
+    logger.info("GPU not available, using CPU")
+    return "cpu"
+
+class VoiceCloner:
+    """
+    XTTS voice cloner that loads its model once and reuses it for every request,
+    so the multi-second, multi-GB load is paid a single time.
+    """
+    
+    def __init__(self, model_name=XTTS_MODEL_NAME, device=None, compile_model=XTTS_COMPILE,
+                 warmup_speaker_wav=None):
+        """
+        Load the model.
+        
+        Args:
+            model_name (str): Coqui TTS model name
+            device (str, optional): "cuda" or "cpu"; picked automatically if None
+            compile_model (bool): Compile the GPT decoder and vocoder with torch.compile
+            warmup_speaker_wav (str, optional): Reference audio for warmup runs, so compilation
+                                                happens here instead of on the first request
+        """
+        # Check if the environment variable is set for PyTorch 2.6+ compatibility
+        os.environ["TORCH_FULL_LOAD"] = "1"
+        
+        self.model_name = model_name
+        self.device = device or _get_device()
+        # Use PyTorch 2.6+ compatible way to load the model (loaded once per process)
+        self.tts = get_tts(model_name, self.device)
+        
+        if compile_model:
+            compile_xtts(self.tts)
+        if warmup_speaker_wav:
+            self.warmup(warmup_speaker_wav)
+    
+    def warmup(self, speaker_wav, target_lang="en", iterations=2):
+        """
+        Run a few short syntheses to trigger compilation and CUDA initialization,
+        so later requests see steady-state latency.
+        """
+        start_time = time.monotonic()
+        with tempfile.TemporaryDirectory() as warmup_dir:
+            for i in range(iterations):
+                self.synthesize("Warmup test.", speaker_wav, target_lang,
+                                os.path.join(warmup_dir, f"warmup_{i}.wav"))
+        logger.info("XTTS warmup completed in %.2f seconds", time.monotonic() - start_time)
+    
+    def synthesize(self, text, speaker_wav, target_lang="en", output_path=None):
+        """
+        Generate speech in the voice of a reference audio sample.
+        
+        Args:
+            text (str): The text to convert to speech
+            speaker_wav (str): Path to the audio file containing the speaker's voice
+            target_lang (str): Target language code (e.g., 'en', 'fr', 'tr')
+            output_path (str, optional): Path to save the generated audio file.
+                                        If None, will generate a path.
+        
+        Returns:
+            str: Path to the generated audio file
+        
+        Raises:
+            ValueError: If the text has nothing to speak
+            Exception: Whatever the underlying model raises; callers decide how to fall back
+        """
+        sentences = split_text(normalize_for_tts(text), max_chars=XTTS_MAX_CHARS)
+        if not sentences:
+            raise ValueError("No text to synthesize")
+        
+        import numpy as np
+        import torch
+        
+        if not output_path:
+            output_path = os.path.join(ensure_dir(OUTPUTS_DIR), f"xtts_cloned_{int(time.time())}.wav")
+        
+        # Get the XTTS language code
+        xtts_lang = xtts_language(target_lang)
+        
+        # Encode the reference voice once per file, then call the model directly with the
+        # cached latents instead of letting tts_to_file re-run the speaker encoder
+        xtts_model = self.tts.synthesizer.tts_model
+        gpt_cond_latent, speaker_embedding = get_speaker_latents(xtts_model, speaker_wav,
+                                                                self.model_name, self.device)
+        
+        # Generate speech with voice cloning sentence by sentence, without autograd bookkeeping;
+        # on GPU under fp16 autocast
+        wavs = []
+        with torch.inference_mode(), cuda_autocast():
+            for sentence in sentences:
+                out = xtts_model.inference(sentence, xtts_lang, gpt_cond_latent, speaker_embedding)
+                wavs.append(np.asarray(out["wav"], dtype=np.float32))
+        
+        write_wav(output_path, np.concatenate(wavs), xtts_model.config.audio.output_sample_rate)
+        return output_path
+    
+    def synthesize_batch(self, requests):
+        """
+        Generate speech for several requests with the loaded model.
+        
+        Args:
+            requests (list): (text, speaker_wav, target_lang, output_path) tuples
+        
+        Returns:
+            list: Path to each generated audio file
+        """
+        return [self.synthesize(*request) for request in requests]
+
+@lru_cache(maxsize=1)
+def _get_default_cloner():
+    """Create the shared VoiceCloner on first use."""
+    return VoiceCloner()
+
+# VoiceCloner of the current process-pool worker (set by _init_worker)
+_WORKER_CLONER = None
+
+def _init_worker(model_name):
+    """Process-pool initializer: load the model once per worker, single-threaded on the CPU."""
+    global _WORKER_CLONER
+    limit_process_cpu_threads()
+    _WORKER_CLONER = VoiceCloner(model_name, device="cpu", compile_model=False)
+
+def _synthesize_in_worker(request):
+    """Run one (text, speaker_wav, target_lang, output_path) request on the worker's model."""
+    try:
+        return _WORKER_CLONER.synthesize(*request)
+    except Exception as e:
+        logger.error("XTTS synthesis failed in worker: %s", e)
+        return None
+
+def synthesize_many_cpu(requests, workers=None, model_name=XTTS_MODEL_NAME):
+    """
+    Synthesize many requests with XTTS on the CPU in parallel across processes.
+    Each worker loads the model once and runs single-threaded, so the cores are
+    used by independent sentences instead of contending over one. Every worker holds
+    its own copy of the model (a few GB of RAM each), which bounds the useful worker count.
+    
+    Args:
+        requests (list): (text, speaker_wav, target_lang, output_path) tuples
+        workers (int, optional): Number of worker processes; half the CPU count if None
+        model_name (str): Coqui TTS model name
+    
+    Returns:
+        list: Path to each generated audio file, or None where synthesis failed
+    """
+    if workers is None:
+        workers = max(1, (os.cpu_count() or 2) // 2)
+    
+    logger.info("Synthesizing %d requests on the CPU with %d worker processes", len(requests), workers)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(model_name,)) as executor:
+        return list(executor.map(_synthesize_in_worker, requests))
+
 def clone_voice_fallback(text, target_lang="en", output_path=None):
     """
     A fallback method for generating speech when voice cloning fails.
-    Uses gTTS (Google Text-to-Speech) as an alternative.
+    Uses an offline Piper voice when one is installed for the language,
+    otherwise gTTS (Google Text-to-Speech).
     
     Args:
         text (str): The text to convert to speech
         target_lang (str): Target language code (e.g., 'en', 'fr', 'tr')
         output_path (str, optional): Path to save the generated audio file.
-                                    If None, will generate a path.
+                                    If None, will generate a path. Piper output
+                                    gets a .wav extension instead.
     
     Returns:
-        str: Path to the generated audio file, or None if generation failed
+        str: Path to the generated audio file (MP3 from gTTS, WAV from Piper),
+             or None if generation failed
     """
-    start_time = time.time()
+    start_time = time.monotonic()
     
     # Log the start of the process
-    logger.info(f"Starting fallback TTS for language: {target_lang}")
-    logger.info(f"Output path: {output_path}")
+    logger.info("Starting fallback TTS for language: %s", target_lang)
+    logger.info("Output path: %s", output_path)
     
     # Generate output path if not provided
     if not output_path:
-        output_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "outputs")
-        os.makedirs(output_dir, exist_ok=True)
-        output_path = os.path.join(output_dir, f"gtts_{int(time.time())}.mp3")
+        output_path = os.path.join(ensure_dir(OUTPUTS_DIR), f"gtts_{int(time.time())}.mp3")
     
     # Ensure output directory exists
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    
-    # Map language codes to gTTS format
-    lang_mapping = {
-        "en": "en",
-        "fr": "fr",
-        "tr": "tr",
-        "es": "es",
-        "it": "it",
-        "de": "de",
-        "pt": "pt",
-        "pl": "pl",
-        "ru": "ru",
-        "nl": "nl",
-        "cs": "cs",
-        "ar": "ar",
-        "zh": "zh-CN",
-        "ja": "ja",
-        "ko": "ko",
-        "hu": "hu"
-    }
+    ensure_dir(os.path.dirname(output_path))
     
     # Get the gTTS language code
-    gtts_lang = lang_mapping.get(target_lang.lower(), "en")
-    logger.info(f"Using language code '{gtts_lang}' for gTTS")
+    gtts_lang = _GTTS_LANG_MAP.get(target_lang.lower(), "en")
+    logger.info("Using language code '%s' for gTTS", gtts_lang)
     
     try:
-        # Generate speech using gTTS
-        logger.info("Generating speech with gTTS...")
-        tts = gTTS(text=text, lang=gtts_lang, slow=False)
-        tts.save(output_path)
+        # Prefer a local Piper voice (WAV); only go to Google (MP3) when none is installed
+        offline_path = _offline_tts(text, target_lang[:2].lower(), output_path)
+        if offline_path:
+            output_path = offline_path
+        else:
+            _gtts_to_file(text, gtts_lang, output_path)
         
         # Log performance metrics
-        end_time = time.time()
+        end_time = time.monotonic()
         generation_time = end_time - start_time
-        file_size_mb = os.path.getsize(output_path) / (1024 * 1024)
         
-        logger.info(f"Speech generation completed in {generation_time:.2f} seconds")
-        logger.info(f"Generated audio saved to: {output_path} ({file_size_mb:.2f} MB)")
+        logger.info("Speech generation completed in %.2f seconds", generation_time)
+        # The size is only needed for the log line; skip the stat when INFO is disabled
+        if logger.isEnabledFor(logging.INFO):
+            file_size_mb = os.path.getsize(output_path) / (1024 * 1024)
+            logger.info("Generated audio saved to: %s (%.2f MB)", output_path, file_size_mb)
         
         return output_path
         
     except Exception as e:
-        logger.error(f"Error in fallback speech generation: {str(e)}")
+        logger.error("Error in fallback speech generation: %s", e)
         return None
 
+def stream_gtts(text, target_lang="en"):
+    """
+    Stream gTTS audio without touching the disk, e.g. to send it straight to a client.
+    
+    Args:
+        text (str): The text to convert to speech
+        target_lang (str): Target language code (e.g., 'en', 'fr', 'tr')
+    
+    Yields:
+        bytes: MP3 data, one chunk per gTTS request as soon as it arrives
+    """
+    gtts_lang = _GTTS_LANG_MAP.get(target_lang.lower(), "en")
+    yield from gTTS(text=text, lang=gtts_lang, slow=False).stream()
+
+def clone_voice_fallback_many(items, max_workers=_GTTS_MAX_WORKERS):
+    """
+    Generate speech for several texts with gTTS using a thread pool.
+    gTTS is network-bound, so threads overlap the round trips; 10 workers gave
+    near-linear speedup while staying clear of Google's rate limits.
+    
+    Args:
+        items (list): (text, target_lang, output_path) tuples
+        max_workers (int): Maximum number of concurrent gTTS requests
+    
+    Returns:
+        list: Path to each generated audio file, or None where generation failed
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda item: clone_voice_fallback(*item), items))
+
+async def clone_voice_fallback_async(text, target_lang="en", output_path=None):
+    """
+    Async version of clone_voice_fallback() for use from event loops (e.g. web handlers).
+    The gTTS request and file I/O run in a worker thread, so the loop keeps serving other tasks.
+    
+    Returns:
+        str: Path to the generated audio file, or None if generation failed
+    """
+    return await asyncio.to_thread(clone_voice_fallback, text, target_lang, output_path)
+
+async def clone_voice_fallback_batch(texts, target_langs, output_paths, concurrency=8):
+    """
+    Generate speech for several texts with gTTS concurrently.
+    Each request runs through clone_voice_fallback_async; a semaphore caps
+    how many requests are in flight at once.
+    
+    Args:
+        texts (list): Texts to convert to speech
+        target_langs (list or str): Target language code per text, or one code for all
+        output_paths (list): Path to save the audio of each text
+        concurrency (int): Maximum number of concurrent gTTS requests
+    
+    Returns:
+        list: Path to each generated audio file, or None where generation failed
+    """
+    if isinstance(target_langs, str):
+        target_langs = [target_langs] * len(texts)
+    
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def generate(text, target_lang, output_path):
+        async with semaphore:
+            return await clone_voice_fallback_async(text, target_lang, output_path)
+    
+    return await asyncio.gather(*(
+        generate(text, target_lang, output_path)
+        for text, target_lang, output_path in zip(texts, target_langs, output_paths)
+    ))
+
 def clone_voice_and_speak(text, speaker_wav_path=None, target_lang="en", output_path=None):
     """
     Try to clone a voice from an audio sample, falling back to gTTS if that fails.
@@ -104,74 +562,25 @@ def clone_voice_and_speak(text, speaker_wav_path=None, target_lang="en", output_
     """
     logger.info("Attempting to generate speech using fallback method...")
     
+    # Normalize once; both the XTTS and the gTTS lookups use the lowercase code
+    target_lang = target_lang.lower()
+    
     # Try the initial strategy first
-    try:
-        from TTS.api import TTS
-        import torch
-        
-        # Check if the environment variable is set for PyTorch 2.6+ compatibility
-        os.environ["TORCH_FULL_LOAD"] = "1"
-        
-        logger.info(f"Using PyTorch {torch.__version__}")
-        logger.info(f"Attempting to load XTTS model...")
-        
-        # Try to initialize the TTS with voice cloning model
-        if torch.cuda.is_available():
-            logger.info("GPU is available, using CUDA")
-            device = "cuda"
+    # If speaker_wav_path is valid, attempt voice cloning
+    if speaker_wav_path and os.path.exists(speaker_wav_path):
+        try:
+            cloner = _get_default_cloner()
+        except Exception as e:
+            logger.warning("Could not initialize TTS model: %s", e)
+            logger.info("Falling back to gTTS...")
         else:
-            logger.info("GPU not available, using CPU")
-            device = "cpu"
-        
-        model_name = "tts_models/multilingual/multi-dataset/xtts_v2"
-        
-        # If speaker_wav_path is valid, attempt voice cloning
-        if speaker_wav_path and os.path.exists(speaker_wav_path):
             try:
-                # Use PyTorch 2.6+ compatible way to load the model
-                tts = TTS(model_name=model_name, gpu=(device == "cuda"))
-                
-                # Map language codes
-                lang_mapping = {
-                    "en": "en",
-                    "fr": "fr",
-                    "tr": "tr",
-                    "es": "es",
-                    "it": "it",
-                    "de": "de",
-                    "pt": "pt",
-                    "pl": "pl",
-                    "ru": "ru",
-                    "nl": "nl",
-                    "cs": "cs",
-                    "ar": "ar",
-                    "zh": "zh-cn",
-                    "ja": "ja",
-                    "ko": "ko",
-                    "hu": "hu"
-                }
-                
-                # Get the XTTS language code
-                xtts_lang = lang_mapping.get(target_lang.lower(), "en")
-                
-                # Generate speech with voice cloning
-                tts.tts_to_file(
-                    text=text,
-                    file_path=output_path,
-                    speaker_wav=speaker_wav_path,
-                    language=xtts_lang
-                )
-                
-                logger.info(f"XTTS voice cloning successful: {output_path}")
+                output_path = cloner.synthesize(text, speaker_wav_path, target_lang, output_path)
+                logger.info("XTTS voice cloning successful: %s", output_path)
                 return output_path
-                
             except Exception as e:
-                logger.warning(f"XTTS voice cloning failed: {str(e)}")
+                logger.warning("XTTS voice cloning failed: %s", e)
                 logger.info("Falling back to gTTS...")
-        
-    except Exception as e:
-        logger.warning(f"Could not initialize TTS model: {str(e)}")
-        logger.info("Falling back to gTTS...")
     
     # Fallback to gTTS
     return clone_voice_fallback(text, target_lang, output_path)